@@ -0,0 +1,272 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "CleanOrphanUIDs.py")
+# Total file counts of the synthetic projects.
+PRESETS = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+SOURCE_SUFFIXES = (".cs", ".gdshader", ".gd")
+ASSET_SUFFIXES = (".png", ".ogg", ".glb")
+UID_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789"
+# Modes run against every project: extra arguments for CleanOrphanUIDs.py, whether they report orphans
+# and whether an unmeasured run has to prime them first.
+MODES = {
+    "serial": ([], True, False),
+    "parallel": (["--workers", "8"], True, False),
+    "cache-cold": (["--cache", "--rebuild-cache"], True, False),
+    "cache-warm": (["--cache"], True, True),
+    "git-index": (["--git"], True, False),
+    "registry": (["--registry"], False, False),
+}
+# A mode slower than its baseline by more than this fraction counts as a regression.
+REGRESSION_THRESHOLD = 0.10
+# CleanOrphanUIDs.py exits with 0 when clean and 1 when it found something, anything else is a failed run.
+VALID_EXIT_CODES = (0, 1)
+
+
+def random_uid(rng: random.Random) -> str:
+    return "uid://" + "".join(rng.choice(UID_ALPHABET) for _ in range(13))
+
+
+def generate_project(
+    root: str,
+    files: int,
+    depth: int = 6,
+    files_per_dir: int = 50,
+    uid_density: float = 0.5,
+    orphan_ratio: float = 0.01,
+    scene_density: float = 0.05,
+    scene_references: int = 8,
+    seed: int = 0,
+) -> set:
+    # Writes a synthetic Godot project of roughly `files` files below root and returns the project
+    # relative paths of the orphaned sidecars it planted. uid_density is the share of files that are
+    # scripts or shaders with a sidecar, orphan_ratio the share of those sidecars whose source is
+    # missing and scene_density the share of .tscn files, each referencing scene_references uids.
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, "project.godot"), "w", encoding="utf-8") as file:
+        file.write('config_version=5\n\n[application]\n\nconfig/name="Benchmark"\n')
+
+    directories = [("", 0)]
+    for i in range(max(1, math.ceil(files / files_per_dir)) - 1):
+        parent, level = rng.choice([d for d in directories[-64:] if d[1] < depth] or directories[:1])
+        rel = f"{parent}dir{i}/"
+        os.mkdir(os.path.join(root, rel))
+        directories.append((rel, level + 1))
+
+    orphans = set()
+    uids = []
+    written = 1
+    unit = 0
+    while written < files:
+        rel = directories[unit % len(directories)][0]
+        roll = rng.random()
+        if roll < uid_density:
+            name = f"{rel}Source{unit}{rng.choice(SOURCE_SUFFIXES)}"
+            uid = random_uid(rng)
+            uids.append(uid)
+            with open(os.path.join(root, name + ".uid"), "w", encoding="utf-8") as file:
+                file.write(uid + "\n")
+            written += 1
+            if rng.random() < orphan_ratio:
+                orphans.add(name + ".uid")
+            else:
+                open(os.path.join(root, name), "w").close()
+                written += 1
+        elif roll < uid_density + scene_density:
+            lines = [f'[gd_scene load_steps=2 format=3 uid="{random_uid(rng)}"]\n']
+            for n in range(min(scene_references, len(uids))):
+                lines.append(f'\n[ext_resource type="Script" uid="{rng.choice(uids)}" path="res://{rel}x{n}.cs" id="{n}"]')
+            with open(os.path.join(root, f"{rel}Scene{unit}.tscn"), "w", encoding="utf-8") as file:
+                file.write("".join(lines) + '\n\n[node name="Root" type="Node"]\n')
+            written += 1
+        else:
+            open(os.path.join(root, f"{rel}Asset{unit}{rng.choice(ASSET_SUFFIXES)}"), "w").close()
+            written += 1
+        unit += 1
+
+    # Backdate every directory, the scan cache never trusts mtimes from the last couple of seconds.
+    settled = time.time() - 60
+    for rel, _ in directories:
+        os.utime(os.path.join(root, rel), (settled, settled))
+    return orphans
+
+
+def commit_project(root: str):
+    environment = dict(os.environ, GIT_AUTHOR_NAME="bench", GIT_AUTHOR_EMAIL="bench@localhost")
+    environment.update(GIT_COMMITTER_NAME="bench", GIT_COMMITTER_EMAIL="bench@localhost")
+    for command in (["git", "init", "-q"], ["git", "add", "-A"], ["git", "commit", "-q", "-m", "benchmark"]):
+        subprocess.run(command, cwd=root, env=environment, check=True)
+
+
+def count_syscalls(summary: str):
+    # Total of the "calls" column from strace -c output.
+    for line in reversed(summary.splitlines()):
+        parts = line.split()
+        if len(parts) >= 5 and parts[-1] == "total":
+            return int(parts[3])
+    return None
+
+
+def run_mode(root: str, arguments, strace: bool = False, reports_orphans: bool = True) -> dict:
+    # Runs CleanOrphanUIDs.py in its own process, so peak RSS and syscalls belong to that mode alone.
+    # Only the orphan scan has a machine readable form, the other modes reject --format.
+    output_format = ["--format", "ndjson"] if reports_orphans else []
+    command = [sys.executable, SCRIPT, root, "--dry-run", *output_format, *arguments]
+    trace = None
+    if strace:
+        trace = tempfile.NamedTemporaryFile(suffix=".strace", delete=False).name
+        command = ["strace", "-f", "-c", "-o", trace, *command]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = process.stdout.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    orphans = set()
+    for line in output.splitlines():
+        record = json.loads(line) if line.startswith(b"{") else {}
+        if record.get("type") == "orphan":
+            orphans.add(os.path.relpath(record["path"], root).replace(os.sep, "/"))
+    syscalls = None
+    if trace is not None:
+        with open(trace, encoding="utf-8") as file:
+            syscalls = count_syscalls(file.read())
+        os.remove(trace)
+    return {
+        "wall": round(wall, 4),
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+        "max_rss_kb": usage.ru_maxrss // (1024 if sys.platform == "darwin" else 1),
+        "syscalls": syscalls,
+        "exit_code": process.returncode,
+        "orphans": orphans,
+    }
+
+
+def compare_baseline(results: dict, baseline: dict) -> list:
+    # Returns (preset, mode, baseline wall, wall, change) for every run present and valid in both.
+    previous = {(r["preset"], r["mode"]): r for r in baseline.get("runs", ()) if not r.get("failed")}
+    rows = []
+    for run in results["runs"]:
+        old = previous.get((run["preset"], run["mode"]))
+        if old is not None and old["wall"] > 0 and not run["failed"]:
+            rows.append((run["preset"], run["mode"], old["wall"], run["wall"], run["wall"] / old["wall"] - 1))
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CleanOrphanUIDs.py against synthetic Godot projects.")
+    parser.add_argument("presets", nargs="*", metavar="preset", help=f"project sizes to run: {', '.join(PRESETS)} (default: 10k)")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma separated modes (default: %(default)s)")
+    parser.add_argument("--depth", type=int, default=6, help="maximum directory depth (default: %(default)s)")
+    parser.add_argument("--files-per-dir", type=int, default=50, help="average files per directory (default: %(default)s)")
+    parser.add_argument("--uid-density", type=float, default=0.5, help="share of files with a sidecar (default: %(default)s)")
+    parser.add_argument("--orphan-ratio", type=float, default=0.01, help="share of orphaned sidecars (default: %(default)s)")
+    parser.add_argument("--scene-density", type=float, default=0.05, help="share of .tscn files (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="where projects are generated and kept (default: a removed temp directory)")
+    parser.add_argument("--strace", action="store_true", help="count syscalls with strace -f -c")
+    parser.add_argument("-o", "--output", default="uid_benchmark.json", help="results file (default: %(default)s)")
+    parser.add_argument("--baseline", help="results file to compare wall times against")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with 1 when a mode regressed")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    presets = args.presets or ["10k"]
+    modes = [m for m in args.modes.split(",") if m]
+    unknown = (set(modes) - MODES.keys()) | (set(presets) - PRESETS.keys())
+    if unknown:
+        print(f"Unknown presets or modes: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    if args.strace and shutil.which("strace") is None:
+        print("strace not found, syscall counts will be missing", file=sys.stderr)
+        args.strace = False
+    if "git-index" in modes and shutil.which("git") is None:
+        print("git not found, skipping git-index", file=sys.stderr)
+        modes.remove("git-index")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="uid-bench-")
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [],
+    }
+    mismatches = failures = 0
+    try:
+        for preset in presets:
+            root = os.path.join(workdir, preset)
+            if os.path.isdir(root):
+                shutil.rmtree(root)
+            started = time.perf_counter()
+            expected = generate_project(
+                root,
+                PRESETS[preset],
+                args.depth,
+                args.files_per_dir,
+                args.uid_density,
+                args.orphan_ratio,
+                args.scene_density,
+                seed=args.seed,
+            )
+            print(f"{preset}: generated in {time.perf_counter() - started:.1f}s, {len(expected)} planted orphans")
+            if "git-index" in modes:
+                commit_project(root)
+            for mode in modes:
+                arguments, reports_orphans, primed = MODES[mode]
+                if primed:
+                    run_mode(root, arguments, reports_orphans=reports_orphans)
+                run = run_mode(root, arguments, args.strace, reports_orphans)
+                orphans = run.pop("orphans")
+                run["failed"] = run["exit_code"] not in VALID_EXIT_CODES
+                run["identical"] = orphans == expected if reports_orphans and not run["failed"] else None
+                failures += run["failed"]
+                if run["identical"] is False:
+                    mismatches += 1
+                run.update(preset=preset, mode=mode, files=PRESETS[preset], orphans=len(orphans))
+                results["runs"].append(run)
+                print(
+                    f"  {mode:<11} {run['wall']:>8.3f}s {run['max_rss_kb'] / 1024:>8.1f} MiB "
+                    f"syscalls={run['syscalls']} orphans={run['orphans']}"
+                    f"{'  MISMATCH' if run['identical'] is False else ''}"
+                    f"{'  FAILED (exit code ' + str(run['exit_code']) + ')' if run['failed'] else ''}"
+                )
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=1)
+    print(f"Results written to {args.output}")
+
+    regressions = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            rows = compare_baseline(results, json.load(file))
+        for preset, mode, old, new, change in rows:
+            regressed = change > REGRESSION_THRESHOLD
+            regressions += regressed
+            print(f"  {preset:<5} {mode:<11} {old:>8.3f}s -> {new:>8.3f}s {change:+.1%}{'  REGRESSION' if regressed else ''}")
+    if failures:
+        print(f"{failures} runs failed, their timings were not compared.", file=sys.stderr)
+    if mismatches:
+        print(f"{mismatches} runs reported a different orphan set.", file=sys.stderr)
+    if failures or mismatches:
+        return 1
+    return 1 if args.fail_on_regression and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
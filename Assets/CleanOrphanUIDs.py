@@ -1,44 +1,1623 @@
-import os, pathlib
-
-def find_duplicate_names_in_folders(directory):
-    files_by_path = set()
-
-    # Walk through the directory
-    for path in pathlib.Path(directory).rglob("*"):
-        if path.is_file():
-            files_by_path.add(path)
-    
-    orphaned = set()
-    for path in files_by_path:
-        if path.suffix == ".uid":
-            check_path = path.parent / path.stem
-            if check_path not in files_by_path:
-                orphaned.add(path)
-    
-    return orphaned
-
-# Replace 'your_directory_path' with the path you want to search
-os.curdir = os.path.dirname(__file__)
-directory_path = '../'
-duplicates = find_duplicate_names_in_folders(directory_path)
-
-if duplicates:
-    print(f"Found {len(duplicates)} orphaned:")
-    for file in duplicates:
-        print(f"Duplicate name found: {file}")
-        #for file in files:  print(f"  - {file}")
+import argparse
+import collections
+import contextlib
+import ctypes
+import errno
+import fnmatch
+import glob
+import hashlib
+import json
+import mmap
+import os
+import pathlib
+import posixpath
+import re
+import select
+import shutil
+import sqlite3
+import struct
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+UID_SUFFIX = ".uid"
+# Godot's import cache, VCS metadata and the old Godot 3 ".import" folder never hold sidecars we care about.
+DEFAULT_EXCLUDES = (".godot", ".git", ".import")
+# Bump whenever the layout of the scan cache or what gets stored in it changes.
+CACHE_VERSION = 1
+# The project this script is vendored in, whatever the working directory is.
+DEFAULT_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+DEFAULT_CACHE_PATH = os.path.join(".godot", "uid_scan_cache.db")
+DEFAULT_QUARANTINE_PATH = os.path.join(".godot", "uid_quarantine")
+MANIFEST_NAME = "manifest.json"
+# Exit codes: clean, orphans (or other findings) left in place, and a usage error, the code argparse exits with.
+EXIT_CLEAN = 0
+EXIT_FOUND = 1
+EXIT_USAGE = 2
+# A scene or resource header declares the file's own uid, every other uid:// in a file is a reference.
+UID_TOKEN = re.compile(rb'^\[(?:gd_scene|gd_resource)\b[^\n]*?\buid="(uid://[0-9a-z]+)"|(uid://[0-9a-z]+)', re.M)
+RESOURCE_SUFFIXES = (".tscn", ".tres")
+SHADER_SUFFIXES = (".gdshader", ".gdshaderinc")
+# Quoted res:// paths anywhere, plus shader includes which may also be relative to the including file.
+RES_REFERENCE = re.compile(rb'^[ \t]*#include[ \t]+"([^"\n]+)"|"(res://[^"\n]*)"', re.M)
+RES_PREFIX = "res://"
+IMPORT_SUFFIX = ".import"
+PROJECT_FILE = "project.godot"
+# Below this many files a process pool costs more than it saves.
+MIN_POOL_FILES = 256
+# Directories modified this recently may still change within the same mtime tick, so they are never trusted.
+RACY_MTIME_NS = 2_000_000_000
+
+
+def compile_excludes(patterns):
+    # One regex for every glob, matched against both the entry name and its project relative path.
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns)).match
+
+
+def list_directory(path: str, rel: str, excluded=None):
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                if excluded is not None and (excluded(name) or excluded(rel + name)):
+                    continue
+                # d_type answers both checks for regular entries, so no stat() is issued.
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(name)
+                elif entry.is_file():
+                    files.append(name)
+    except OSError:
+        # Unreadable or vanished directories are treated as empty, like rglob does.
+        pass
+    subdirs.sort()
+    return files, subdirs
+
+
+def orphans_in_directory(files) -> list:
+    uids = [n for n in files if n.endswith(UID_SUFFIX) and len(n) > len(UID_SUFFIX)]
+    if not uids:
+        return uids
+    names = set(files)
+    return sorted(n for n in uids if n[: -len(UID_SUFFIX)] not in names)
+
+
+class DirectoryIndex:
+    # On disk cache of every directory listing, keyed by the directory's relative path and mtime.
+    # Adding, removing or renaming an entry bumps the mtime of its parent, so an unchanged mtime means
+    # the cached names can be reused without listing the directory again.
+
+    def __init__(self, path: str, root: str, excludes, rebuild: bool = False):
+        self.path = path
+        self.root = os.path.realpath(root)
+        self.excludes = "\n".join(excludes or ())
+        self.entries = {}
+        self.changed = {}
+        self.seen = set()
+        self.invalidated = "forced rebuild" if rebuild else None
+        if not rebuild:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            self.invalidated = "no cache yet"
+            return
+        try:
+            with sqlite3.connect(self.path) as db:
+                meta = dict(db.execute("SELECT key, value FROM meta"))
+                for key, expected in (("version", str(CACHE_VERSION)), ("root", self.root), ("excludes", self.excludes)):
+                    if meta.get(key) != expected:
+                        self.invalidated = f"{key} changed"
+                        return
+                for rel, mtime_ns, files, subdirs in db.execute("SELECT rel, mtime_ns, files, subdirs FROM dirs"):
+                    self.entries[rel] = (mtime_ns, _split_names(files), _split_names(subdirs))
+        except sqlite3.DatabaseError:
+            self.entries.clear()
+            self.invalidated = "unreadable cache"
+
+    def list_directory(self, path: str, rel: str, excluded=None):
+        # Returns the listing and whether it came from the cache. Only reads shared state, so it is
+        # safe to call from the walker threads; recording the result is left to the consumer.
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return [], [], 0, False
+        entry = self.entries.get(rel)
+        if entry is not None and entry[0] == mtime_ns:
+            return entry[1], entry[2], mtime_ns, True
+        files, subdirs = list_directory(path, rel, excluded)
+        if time.time_ns() - mtime_ns < RACY_MTIME_NS:
+            mtime_ns = 0
+        return files, subdirs, mtime_ns, False
+
+    def record(self, rel: str, files, subdirs, mtime_ns: int, reused: bool):
+        self.seen.add(rel)
+        if not reused:
+            self.changed[rel] = (mtime_ns, files, subdirs)
+
+    def save(self, complete: bool):
+        # A partial walk only adds what it listed; vanished directories are dropped after full walks.
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with sqlite3.connect(self.path) as db:
+            if self.invalidated is not None:
+                db.execute("DROP TABLE IF EXISTS meta")
+                db.execute("DROP TABLE IF EXISTS dirs")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS dirs "
+                "(rel TEXT PRIMARY KEY, mtime_ns INTEGER, files TEXT, subdirs TEXT) WITHOUT ROWID"
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                (("version", str(CACHE_VERSION)), ("root", self.root), ("excludes", self.excludes)),
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                ((rel, m, "\0".join(f), "\0".join(d)) for rel, (m, f, d) in self.changed.items()),
+            )
+            if complete and self.invalidated is None:
+                db.executemany("DELETE FROM dirs WHERE rel = ?", ((rel,) for rel in self.entries.keys() - self.seen))
+        self.entries.update(self.changed)
+        self.changed.clear()
+        self.invalidated = None
+
+
+def _split_names(joined: str) -> list:
+    return joined.split("\0") if joined else []
+
+
+def find_git_checkout(start: str):
+    # Returns (worktree top, git dir) for the checkout containing start, following "gitdir:" files
+    # used by linked worktrees and submodules, or None outside of any repository.
+    path = os.path.realpath(start)
     while True:
-        r = input("Delete y/n?")
+        dot_git = os.path.join(path, ".git")
+        if os.path.isdir(dot_git):
+            return path, dot_git
+        if os.path.isfile(dot_git):
+            with open(dot_git, encoding="utf-8") as file:
+                line = file.readline().strip()
+            if line.startswith("gitdir:"):
+                return path, os.path.normpath(os.path.join(path, line[len("gitdir:"):].strip()))
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _git_hash_size(git_dir: str) -> int:
+    config_dirs = [git_dir]
+    commondir = os.path.join(git_dir, "commondir")
+    if os.path.isfile(commondir):
+        with open(commondir, encoding="utf-8") as file:
+            config_dirs.append(os.path.normpath(os.path.join(git_dir, file.read().strip())))
+    for config_dir in config_dirs:
+        try:
+            with open(os.path.join(config_dir, "config"), encoding="utf-8") as file:
+                if re.search(r"^\s*objectformat\s*=\s*sha256\s*$", file.read(), re.M | re.I):
+                    return 32
+        except OSError:
+            pass
+    return 20
+
+
+def _read_varint(data: bytes, pos: int):
+    # Offset encoding used by index v4 path compression.
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
+
+
+def read_git_index(index_path: str, hash_size: int = 20):
+    # Yields (path, size, object id) for every path in the index, straight from the binary index
+    # (versions 2 to 4), without checking the worktree. Raises ValueError for anything it can not
+    # represent faithfully.
+    with open(index_path, "rb") as file:
+        data = file.read()
+    signature, version, count = struct.unpack_from(">4sLL", data, 0)
+    if signature != b"DIRC" or version not in (2, 3, 4):
+        raise ValueError(f"unsupported index format {signature!r} v{version}")
+    pos = 12
+    previous = last = b""
+    for _ in range(count):
+        mode = struct.unpack_from(">L", data, pos + 24)[0]
+        size = struct.unpack_from(">L", data, pos + 36)[0]
+        object_id = data[pos + 40 : pos + 40 + hash_size]
+        flags = struct.unpack_from(">H", data, pos + 40 + hash_size)[0]
+        name_pos = pos + 42 + hash_size
+        extended = 0
+        if version >= 3 and flags & 0x4000:
+            extended = struct.unpack_from(">H", data, name_pos)[0]
+            name_pos += 2
+        if version == 4:
+            strip, name_pos = _read_varint(data, name_pos)
+            end = data.index(b"\0", name_pos)
+            name = previous[: len(previous) - strip] + data[name_pos:end]
+            pos = end + 1
+        else:
+            end = data.index(b"\0", name_pos)
+            name = data[name_pos:end]
+            # Entries are NUL padded to a multiple of eight bytes.
+            pos += (name_pos - pos + len(name) + 8) & ~7
+        previous = name
+        kind = mode & 0o170000
+        if kind == 0o040000:
+            raise ValueError("sparse index directory entries")
+        # Submodules are directories and skip-worktree entries are not checked out. A conflicted path
+        # has consecutive entries at stages 1 to 3, any of which may be missing, and only counts once.
+        if kind == 0o160000 or extended & 0x4000 or (flags >> 12) & 3 and name == last:
+            continue
+        last = name
+        yield name.decode("utf-8", "surrogateescape"), size, object_id
+
+
+def git_untracked_files(root: str) -> list:
+    # Untracked, not ignored files relative to root. Needs the git executable.
+    result = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+        cwd=root,
+        capture_output=True,
+        check=True,
+    )
+    return [p.decode("utf-8", "surrogateescape") for p in result.stdout.split(b"\0") if p]
+
+
+class ScanStats:
+    def __init__(self):
+        self.directories = 0
+        self.files = 0
+        self.reused = 0
+        self.rescanned = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, files, reused: bool = False):
+        self.directories += 1
+        self.files += len(files)
+        if reused:
+            self.reused += 1
+        else:
+            self.rescanned += 1
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    def report(self) -> str:
+        elapsed = max(self.elapsed, 1e-9)
+        return (
+            f"Scanned {self.directories} directories and {self.files} files in {self.elapsed:.3f}s "
+            f"({self.directories / elapsed:.0f} dirs/s, {self.files / elapsed:.0f} files/s)"
+        )
+
+    def cache_report(self) -> str:
+        return f"Cache: {self.reused} directories reused, {self.rescanned} rescanned"
+
+
+class OrphanScanner:
+    def __init__(
+        self,
+        root: str,
+        excludes=DEFAULT_EXCLUDES,
+        workers: int = 1,
+        index: DirectoryIndex = None,
+        git: bool = False,
+        untracked: bool = False,
+    ):
+        self.root = os.fspath(root)
+        self.excluded = compile_excludes(excludes)
+        self.workers = max(1, workers)
+        self.index = index
+        self.git = git or untracked
+        self.untracked = untracked
+        self.source = "filesystem"
+        self.source_note = ""
+        self.stats = ScanStats()
+
+    def walk(self):
+        # Depth first, children in name order, so the output order is stable between runs.
+        self.stats = ScanStats()
+        index = self.index
+        listing = self._walk_git_index() if self.git else None
+        if listing is not None:
+            index = None
+        elif self.workers == 1:
+            listing = self._walk_serial()
+        else:
+            listing = self._walk_parallel()
+        complete = False
+        try:
+            for path, rel, (files, subdirs, mtime_ns, reused) in listing:
+                self.stats.add(files, reused)
+                if index is not None:
+                    index.record(rel, files, subdirs, mtime_ns, reused)
+                yield path, rel, files
+            complete = True
+        finally:
+            self.stats.stop()
+            if index is not None:
+                index.save(complete)
+
+    def git_paths(self):
+        # Root relative paths of every file git knows about below the root, or None outside a checkout.
+        checkout = find_git_checkout(self.root)
+        if checkout is None:
+            self.source, self.source_note = "filesystem", "no git repository found"
+            return None
+        top, git_dir = checkout
+        prefix = os.path.relpath(os.path.realpath(self.root), top).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        try:
+            entries = read_git_index(os.path.join(git_dir, "index"), _git_hash_size(git_dir))
+            paths = [p[len(prefix) :] for p, _, _ in entries if p.startswith(prefix)]
+            if self.untracked:
+                paths += git_untracked_files(self.root)
+        except (OSError, ValueError, struct.error, subprocess.CalledProcessError) as e:
+            self.source, self.source_note = "filesystem", f"git index unusable: {e}"
+            return None
+        self.source = "git index"
+        self.source_note = f"{len(paths)} entries{' including untracked files' if self.untracked else ''}"
+        return paths
+
+    def _walk_git_index(self):
+        # Rebuilds the directory tree from the index, so the staged state is what gets checked,
+        # which is exactly what a pre-commit hook wants.
+        paths = self.git_paths()
+        if paths is None:
+            return None
+        tree = {"": ([], [])}
+        excluded = self.excluded
+
+        def directory(rel: str):
+            if rel in tree:
+                return tree[rel]
+            parent_rel, _, name = rel.rpartition("/")
+            parent = directory(parent_rel)
+            listing = None
+            if parent is not None and not (excluded is not None and (excluded(name) or excluded(rel))):
+                listing = ([], [])
+                parent[1].append(name)
+            tree[rel] = listing
+            return listing
+
+        for path in paths:
+            dir_rel, _, name = path.rpartition("/")
+            listing = directory(dir_rel)
+            if listing is not None and not (excluded is not None and (excluded(name) or excluded(path))):
+                listing[0].append(name)
+        return self._walk_tree(tree)
+
+    def _walk_tree(self, tree):
+        stack = [(self.root, "")]
+        while stack:
+            path, rel = stack.pop()
+            files, subdirs = tree[rel.rstrip("/")]
+            subdirs.sort()
+            yield path, rel, (files, subdirs, 0, False)
+            for name in reversed(subdirs):
+                stack.append((os.path.join(path, name), f"{rel}{name}/"))
+
+    def _list(self, path: str, rel: str):
+        if self.index is not None:
+            return self.index.list_directory(path, rel, self.excluded)
+        files, subdirs = list_directory(path, rel, self.excluded)
+        return files, subdirs, 0, False
+
+    def _walk_serial(self):
+        stack = [(self.root, "")]
+        while stack:
+            path, rel = stack.pop()
+            listing = self._list(path, rel)
+            yield path, rel, listing
+            for name in reversed(listing[1]):
+                stack.append((os.path.join(path, name), f"{rel}{name}/"))
+
+    def _walk_parallel(self):
+        # Every listing schedules its children as soon as it finishes, so the pool fans out over the
+        # tree on its own. The consumer still pops futures in serial order, which keeps the output
+        # identical to _walk_serial no matter how the listings interleave.
+        pool = ThreadPoolExecutor(self.workers, thread_name_prefix="uid-scan")
+
+        def visit(path, rel):
+            listing = self._list(path, rel)
+            children = []
+            for name in listing[1]:
+                try:
+                    children.append(pool.submit(visit, os.path.join(path, name), f"{rel}{name}/"))
+                except RuntimeError:
+                    # The consumer stopped early and the pool is shutting down.
+                    break
+            return path, rel, listing, children
+
+        try:
+            stack = [pool.submit(visit, self.root, "")]
+            while stack:
+                path, rel, listing, children = stack.pop().result()
+                stack.extend(reversed(children))
+                yield path, rel, listing
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def iter_orphans(self):
+        for path, _, files in self.walk():
+            for name in orphans_in_directory(files):
+                yield os.path.join(path, name)
+
+
+def find_duplicate_names_in_folders(directory, excludes=DEFAULT_EXCLUDES, workers: int = 1):
+    return {pathlib.Path(p) for p in OrphanScanner(directory, excludes, workers).iter_orphans()}
+
+
+def is_registry_file(name: str) -> bool:
+    return name.endswith((UID_SUFFIX, IMPORT_SUFFIX, *RESOURCE_SUFFIXES)) or name == PROJECT_FILE
+
+
+def scan_uid_file(path: str):
+    # Returns (declared, referenced) uids of one file. Memory maps the file so large scenes are
+    # matched without copying them into Python.
+    with open(path, "rb") as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped.
+            return (), ()
+        with data:
+            declared, referenced = [], []
+            for header, other in UID_TOKEN.findall(data):
+                if header:
+                    declared.append(header.decode("ascii"))
+                else:
+                    referenced.append(other.decode("ascii"))
+    if path.endswith((UID_SUFFIX, IMPORT_SUFFIX)):
+        # Sidecars and import files only ever declare the uid of the file they sit next to.
+        return tuple(dict.fromkeys(declared + referenced)), ()
+    return tuple(dict.fromkeys(declared)), tuple(dict.fromkeys(referenced))
+
+
+class UidFileCache:
+    # Per file scan results keyed by mtime and size, kept in the same database as the DirectoryIndex.
+    VERSION = 1
+
+    def __init__(self, path: str, root: str, rebuild: bool = False):
+        self.path = path
+        self.root = os.path.realpath(root)
+        self.entries = {}
+        self.changed = {}
+        if not rebuild and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        try:
+            with sqlite3.connect(self.path) as db:
+                meta = dict(db.execute("SELECT key, value FROM uid_meta"))
+                if meta.get("version") != str(self.VERSION) or meta.get("root") != self.root:
+                    return
+                for rel, mtime_ns, size, declared, referenced in db.execute("SELECT * FROM uid_files"):
+                    self.entries[rel] = (mtime_ns, size, tuple(declared.split()), tuple(referenced.split()))
+        except sqlite3.DatabaseError:
+            self.entries.clear()
+
+    def lookup(self, rel: str, stat: os.stat_result):
+        entry = self.entries.get(rel)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2], entry[3]
+        return None
+
+    def store(self, rel: str, stat: os.stat_result, declared, referenced):
+        mtime_ns = stat.st_mtime_ns if time.time_ns() - stat.st_mtime_ns >= RACY_MTIME_NS else 0
+        self.changed[rel] = (mtime_ns, stat.st_size, declared, referenced)
+
+    def save(self, seen):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with sqlite3.connect(self.path) as db:
+            db.execute("CREATE TABLE IF NOT EXISTS uid_meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS uid_files "
+                "(rel TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, declared TEXT, referenced TEXT) WITHOUT ROWID"
+            )
+            meta = dict(db.execute("SELECT key, value FROM uid_meta"))
+            if meta.get("version") != str(self.VERSION) or meta.get("root") != self.root:
+                db.execute("DELETE FROM uid_files")
+                db.executemany(
+                    "INSERT OR REPLACE INTO uid_meta VALUES (?, ?)",
+                    (("version", str(self.VERSION)), ("root", self.root)),
+                )
+            db.executemany(
+                "INSERT OR REPLACE INTO uid_files VALUES (?, ?, ?, ?, ?)",
+                ((rel, m, size, " ".join(d), " ".join(r)) for rel, (m, size, d, r) in self.changed.items()),
+            )
+            db.executemany("DELETE FROM uid_files WHERE rel = ?", ((rel,) for rel in self.entries.keys() - seen))
+        self.entries.update(self.changed)
+        self.changed.clear()
+
+
+class UidRegistry:
+    def __init__(self):
+        self.declared = {}
+        self.referenced = {}
+        self.sidecars = {}
+        self.parsed = 0
+        self.reused = 0
+        self.elapsed = 0.0
+
+    def add(self, rel: str, declared, referenced):
+        if rel.endswith((UID_SUFFIX, IMPORT_SUFFIX)):
+            owner = rel.rsplit(".", 1)[0]
+        else:
+            owner = rel
+        for uid in declared:
+            self.declared.setdefault(uid, set()).add(owner)
+            if rel.endswith(UID_SUFFIX):
+                self.sidecars.setdefault(uid, []).append(rel)
+        for uid in referenced:
+            self.referenced.setdefault(uid, set()).add(rel)
+
+    def duplicates(self):
+        return sorted((uid, sorted(paths)) for uid, paths in self.declared.items() if len(paths) > 1)
+
+    def dangling(self):
+        return sorted((uid, sorted(files)) for uid, files in self.referenced.items() if uid not in self.declared)
+
+    def unreferenced_sidecars(self):
+        return sorted(
+            (rel, uid) for uid, files in self.sidecars.items() if uid not in self.referenced for rel in files
+        )
+
+
+def build_uid_registry(scanner: OrphanScanner, jobs: int = None, cache: UidFileCache = None) -> UidRegistry:
+    # Collects every file that can declare or reference a uid from the scanner's walk, reuses cached
+    # results for files whose mtime and size did not change and parses the rest in a process pool.
+    started = time.perf_counter()
+    registry = UidRegistry()
+    pending = []
+    seen = set()
+    for path, rel, files in scanner.walk():
+        for name in files:
+            if not is_registry_file(name):
+                continue
+            file_rel = rel + name
+            file_path = os.path.join(path, name)
+            if cache is None:
+                pending.append((file_rel, file_path, None))
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            seen.add(file_rel)
+            hit = cache.lookup(file_rel, stat)
+            if hit is None:
+                pending.append((file_rel, file_path, stat))
+            else:
+                registry.add(file_rel, *hit)
+                registry.reused += 1
+
+    with map_files(_scan_uid_file_safe, [p for _, p, _ in pending], jobs) as results:
+        for (file_rel, _, stat), result in zip(pending, results):
+            if result is None:
+                continue
+            registry.add(file_rel, *result)
+            registry.parsed += 1
+            if cache is not None:
+                cache.store(file_rel, stat, *result)
+    if cache is not None:
+        cache.save(seen)
+    registry.elapsed = time.perf_counter() - started
+    return registry
+
+
+@contextlib.contextmanager
+def map_files(func, paths: list, jobs: int = None):
+    # Lazily maps func over paths, in a process pool once there are enough of them.
+    if jobs == 1 or len(paths) < MIN_POOL_FILES:
+        yield map(func, paths)
+        return
+    with ProcessPoolExecutor(jobs) as pool:
+        chunksize = max(1, len(paths) // (4 * (jobs or os.cpu_count() or 1)))
+        yield pool.map(func, paths, chunksize=chunksize)
+
+
+def _scan_uid_file_safe(path: str):
+    try:
+        return scan_uid_file(path)
+    except OSError:
+        return None
+
+
+def print_uid_registry(registry: UidRegistry):
+    for uid, paths in registry.duplicates():
+        print(f"Duplicate uid {uid} declared by: {', '.join(paths)}")
+    for uid, files in registry.dangling():
+        print(f"Dangling uid {uid} referenced from: {', '.join(files)}")
+    for rel, uid in registry.unreferenced_sidecars():
+        print(f"Unreferenced sidecar: {rel} ({uid})")
+    print(
+        f"Registry: {len(registry.declared)} uids declared, {len(registry.referenced)} referenced; "
+        f"parsed {registry.parsed} files, reused {registry.reused} from cache in {registry.elapsed:.3f}s"
+    )
+
+
+def scan_res_references(path: str):
+    # Returns (line, reference) for every res:// path and shader include in one file.
+    with open(path, "rb") as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return []
+        with data:
+            references = []
+            line, last = 1, 0
+            for match in RES_REFERENCE.finditer(data):
+                start = match.start()
+                line += data[last:start].count(b"\n")
+                last = start
+                references.append((line, (match[1] or match[2]).decode("utf-8", "surrogateescape")))
+    return references
+
+
+def _scan_res_references_safe(path: str):
+    try:
+        return scan_res_references(path)
+    except OSError:
+        return []
+
+
+class ProjectPathIndex:
+    # Every project relative file and directory path seen by one walk, so any number of res:// paths
+    # resolve with set lookups instead of one filesystem call each.
+    def __init__(self):
+        self.paths = {""}
+        self.by_name = {}
+        self.by_lower = {}
+
+    def add(self, rel: str):
+        self.paths.add(rel)
+        self.by_name.setdefault(posixpath.basename(rel), []).append(rel)
+        self.by_lower.setdefault(rel.lower(), []).append(rel)
+
+    def __contains__(self, rel: str) -> bool:
+        return rel in self.paths
+
+    def suggest(self, rel: str) -> list:
+        # Same path with different casing first, otherwise anything else with the same name.
+        return sorted(self.by_lower.get(rel.lower(), ())) or sorted(self.by_name.get(posixpath.basename(rel), ()))
+
+
+def check_res_paths(scanner: OrphanScanner, jobs: int = None):
+    # Returns (file, line, reference, suggestions) for every reference that does not resolve.
+    index = ProjectPathIndex()
+    sources = []
+    for path, rel, files in scanner.walk():
+        if rel:
+            index.add(rel[:-1])
+        for name in files:
+            index.add(rel + name)
+            if name.endswith((*RESOURCE_SUFFIXES, *SHADER_SUFFIXES)) or name == PROJECT_FILE:
+                sources.append((rel + name, os.path.join(path, name)))
+
+    excluded = scanner.excluded
+    broken = []
+    with map_files(_scan_res_references_safe, [p for _, p in sources], jobs) as results:
+        for (file_rel, _), references in zip(sources, results):
+            for line, reference in references:
+                if reference.startswith(RES_PREFIX):
+                    target = reference[len(RES_PREFIX) :]
+                else:
+                    target = posixpath.join(posixpath.dirname(file_rel), reference)
+                # Drop sub-resource suffixes and trailing slashes of folder paths.
+                target = posixpath.normpath(target.split("::", 1)[0]).lstrip("/")
+                target = "" if target == "." else target
+                if target in index:
+                    continue
+                if excluded is not None and any(excluded(part) for part in target.split("/")):
+                    # Whatever lives in excluded folders was never indexed.
+                    continue
+                suggestions = [RES_PREFIX + s for s in index.suggest(target)]
+                broken.append((file_rel, line, reference, suggestions))
+    return sorted(broken)
+
+
+def print_broken_res_paths(broken):
+    for file, line, reference, suggestions in broken:
+        hint = f" (did you mean {' or '.join(suggestions)}?)" if suggestions else ""
+        print(f"{file}:{line}: broken path {reference}{hint}")
+    print(f"Found {len(broken)} broken res:// paths." if broken else "No broken res:// paths found.")
+
+
+class Inotify:
+    # Minimal ctypes binding, only the directory entry events the orphan set depends on.
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: str) -> int:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), path)
+        return wd
+
+    def remove_watch(self, wd: int):
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout: float = None) -> list:
+        # Returns (wd, mask) pairs, waiting up to timeout seconds (forever with None) for the first one.
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, pos)
+            events.append((wd, mask))
+            pos += self.EVENT.size + length
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class OrphanWatcher:
+    # Keeps every directory's listing in memory and re-lists only the directories that changed, so
+    # moves and renames update the orphan set without rescanning the project.
+    def __init__(self, scanner: OrphanScanner, debounce: float = 0.2, poll_interval: float = 1.0, poll: bool = False):
+        self.root = scanner.root
+        self.excluded = scanner.excluded
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.inotify = None
+        if not poll and sys.platform.startswith("linux"):
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError):
+                self.inotify = None
+        self.dirs = {}
+        self.watches = {}
+        self.orphans = set()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self.inotify is not None else "polling"
+
+    def _path(self, rel: str) -> str:
+        return os.path.join(self.root, *rel.split("/")[:-1]) if rel else self.root
+
+    def _add_tree(self, rel: str, appeared: set):
+        stack = [rel]
+        while stack:
+            rel = stack.pop()
+            path = self._path(rel)
+            if self.inotify is not None:
+                self._watch(rel, path)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            files, subdirs = list_directory(path, rel, self.excluded)
+            orphans = {os.path.join(path, n) for n in orphans_in_directory(files)}
+            self.dirs[rel] = (mtime_ns, set(files), subdirs, orphans)
+            appeared |= orphans
+            stack.extend(f"{rel}{name}/" for name in reversed(subdirs))
+
+    def _watch(self, rel: str, path: str):
+        try:
+            wd = self.inotify.add_watch(path)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                # Out of inotify watches, every directory is polled from now on.
+                print("Watch: inotify watch limit reached, falling back to polling", file=sys.stderr)
+                self.inotify.close()
+                self.inotify = None
+                self.watches.clear()
+            return
+        # Adding a watch to a moved directory returns its existing descriptor, which now belongs here.
+        self.watches[wd] = rel
+
+    def _remove_tree(self, rel: str, disappeared: set):
+        for sub in [r for r in self.dirs if r.startswith(rel)]:
+            disappeared |= self.dirs.pop(sub)[3]
+        for wd, watched in list(self.watches.items()):
+            if watched.startswith(rel):
+                del self.watches[wd]
+                if self.inotify is not None:
+                    self.inotify.remove_watch(wd)
+
+    def _refresh(self, rel: str, appeared: set, disappeared: set):
+        entry = self.dirs.get(rel)
+        if entry is None:
+            return
+        path = self._path(rel)
+        if not os.path.isdir(path):
+            self._remove_tree(rel, disappeared)
+            return
+        _, _, old_subdirs, old_orphans = entry
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            files, subdirs = list_directory(path, rel, self.excluded)
+        except OSError:
+            # Deleted between the isdir check and the stat.
+            self._remove_tree(rel, disappeared)
+            return
+        orphans = {os.path.join(path, n) for n in orphans_in_directory(files)}
+        self.dirs[rel] = (mtime_ns, set(files), subdirs, orphans)
+        disappeared |= old_orphans - orphans
+        appeared |= orphans - old_orphans
+        old, new = set(old_subdirs), set(subdirs)
+        for name in sorted(old - new):
+            self._remove_tree(f"{rel}{name}/", disappeared)
+        for name in sorted(new - old):
+            self._add_tree(f"{rel}{name}/", appeared)
+
+    def build(self) -> set:
+        appeared = set()
+        self._add_tree("", appeared)
+        self.orphans = appeared
+        return set(appeared)
+
+    def update(self, dirty) -> tuple:
+        # Applies one coalesced batch of changed directories, returns (appeared, disappeared) orphans.
+        appeared, disappeared = set(), set()
+        # Parents first, so a removed subtree is not refreshed directory by directory.
+        for rel in sorted(dirty, key=len):
+            self._refresh(rel, appeared, disappeared)
+        appeared, disappeared = appeared - disappeared, disappeared - appeared
+        appeared -= self.orphans
+        disappeared &= self.orphans
+        self.orphans = (self.orphans | appeared) - disappeared
+        return appeared, disappeared
+
+    def _wait_inotify(self) -> set:
+        dirty = set()
+        timeout = None
+        while True:
+            events = self.inotify.read(timeout)
+            if not events:
+                return dirty
+            for wd, mask in events:
+                if mask & Inotify.IN_Q_OVERFLOW:
+                    dirty.update(self.dirs)
+                elif mask & Inotify.IN_IGNORED:
+                    self.watches.pop(wd, None)
+                elif wd in self.watches:
+                    dirty.add(self.watches[wd])
+            # Keep collecting until the burst goes quiet for one debounce period.
+            timeout = self.debounce
+            if self.inotify is None:
+                return dirty
+
+    def _wait_polling(self) -> set:
+        while True:
+            time.sleep(self.poll_interval)
+            dirty = set()
+            for rel, entry in self.dirs.items():
+                try:
+                    if os.stat(self._path(rel)).st_mtime_ns != entry[0]:
+                        dirty.add(rel)
+                except OSError:
+                    dirty.add(rel)
+            if dirty:
+                return dirty
+
+    def run(self, on_change):
+        on_change(self.build(), set())
+        try:
+            while True:
+                dirty = self._wait_inotify() if self.inotify is not None else self._wait_polling()
+                appeared, disappeared = self.update(dirty)
+                if appeared or disappeared:
+                    on_change(appeared, disappeared)
+        finally:
+            if self.inotify is not None:
+                self.inotify.close()
+
+
+def print_orphan_changes(appeared: set, disappeared: set):
+    stamp = time.strftime("%H:%M:%S")
+    for file in sorted(disappeared):
+        print(f"[{stamp}] Orphan resolved: {file}")
+    for file in sorted(appeared):
+        print(f"[{stamp}] Orphaned uid found: {file}")
+    sys.stdout.flush()
+
+
+class OrphanReporter:
+    # Writes every orphan as soon as it is found, as text lines, one JSON document or NDJSON records.
+    def __init__(self, format: str = "text", stream=None):
+        self.format = format
+        self.stream = stream or sys.stdout
+        self.count = 0
+
+    def info(self, message: str):
+        # Human readable notes never mix with machine readable output.
+        print(message, file=self.stream if self.format == "text" else sys.stderr)
+
+    def orphan(self, path: str):
+        if self.format == "text":
+            print(f"Orphaned uid found: {path}", file=self.stream)
+        elif self.format == "ndjson":
+            print(json.dumps({"type": "orphan", "path": path}), file=self.stream, flush=True)
+        else:
+            separator = "," if self.count else '{"orphans": ['
+            print(f"{separator}\n  {json.dumps(path)}", end="", file=self.stream, flush=True)
+        self.count += 1
+
+    def summary(self, **fields):
+        fields = {"orphans": self.count, **fields}
+        if self.format == "ndjson":
+            print(json.dumps({"type": "summary", **fields}), file=self.stream, flush=True)
+        elif self.format == "json":
+            opening = "" if self.count else '{"orphans": ['
+            print(f'{opening}\n], "summary": {json.dumps(fields)}}}', file=self.stream)
+
+
+def _group_by_directory(paths) -> dict:
+    groups = {}
+    for path in paths:
+        directory, name = os.path.split(path)
+        groups.setdefault(directory or os.curdir, []).append(name)
+    return groups
+
+
+@contextlib.contextmanager
+def _open_directory(path: str):
+    # A directory descriptor for *_dir_fd calls, or None where the platform does not support them.
+    if not {os.unlink, os.rename} <= os.supports_dir_fd:
+        yield None
+        return
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    try:
+        yield fd
+    finally:
+        os.close(fd)
+
+
+def remove_files(paths) -> tuple:
+    # Unlinks relative to one descriptor per directory, so each path is resolved once per directory
+    # instead of once per file. Returns (removed, failed) lists.
+    removed, failed = [], []
+    for directory, names in _group_by_directory(paths).items():
+        try:
+            with _open_directory(directory) as fd:
+                for name in names:
+                    try:
+                        if fd is None:
+                            os.remove(os.path.join(directory, name))
+                        else:
+                            os.unlink(name, dir_fd=fd)
+                        removed.append(os.path.join(directory, name))
+                    except OSError:
+                        failed.append(os.path.join(directory, name))
+        except OSError:
+            failed.extend(os.path.join(directory, name) for name in names)
+    return removed, failed
+
+
+def _move_files(moves) -> tuple:
+    # moves are (source, destination) pairs; renames are done per directory pair with descriptors.
+    moved, failed = [], []
+    groups = {}
+    for source, destination in moves:
+        groups.setdefault((os.path.dirname(source), os.path.dirname(destination)), []).append(
+            (os.path.basename(source), os.path.basename(destination))
+        )
+    for (source_dir, destination_dir), names in groups.items():
+        try:
+            os.makedirs(destination_dir, exist_ok=True)
+            with _open_directory(source_dir) as source_fd, _open_directory(destination_dir) as destination_fd:
+                for source_name, destination_name in names:
+                    source = os.path.join(source_dir, source_name)
+                    destination = os.path.join(destination_dir, destination_name)
+                    try:
+                        if source_fd is None:
+                            os.rename(source, destination)
+                        else:
+                            os.rename(source_name, destination_name, src_dir_fd=source_fd, dst_dir_fd=destination_fd)
+                    except OSError as e:
+                        if e.errno != errno.EXDEV:
+                            failed.append(source)
+                            continue
+                        # The trash folder lives on another device, copy and delete instead.
+                        try:
+                            shutil.move(source, destination)
+                        except OSError:
+                            failed.append(source)
+                            continue
+                    moved.append((source, destination))
+        except OSError:
+            failed.extend(os.path.join(source_dir, name) for name, _ in names)
+    return moved, failed
+
+
+def quarantine_files(paths, root: str, trash: str) -> tuple:
+    # Moves the files below trash, keeping their project relative layout, and writes a manifest that
+    # --restore uses to put them back. Returns (manifest path, failed).
+    root = os.path.abspath(root)
+    trash = os.path.abspath(trash)
+    moves = []
+    for path in paths:
+        rel = os.path.relpath(os.path.abspath(path), root)
+        moves.append((path, os.path.join(trash, rel)))
+    moved, failed = _move_files(moves)
+    manifest = os.path.join(trash, MANIFEST_NAME)
+    os.makedirs(trash, exist_ok=True)
+    with open(manifest, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "root": root,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "files": [
+                    {"original": os.path.relpath(os.path.abspath(s), root), "quarantined": os.path.relpath(d, trash)}
+                    for s, d in moved
+                ],
+            },
+            file,
+            indent=1,
+        )
+    return manifest, failed
+
+
+def restore_quarantine(manifest: str) -> tuple:
+    # Moves quarantined files back, never overwriting a file that took their place. Returns (restored, failed).
+    with open(manifest, encoding="utf-8") as file:
+        data = json.load(file)
+    trash = os.path.dirname(os.path.abspath(manifest))
+    moves, failed = [], []
+    for entry in data["files"]:
+        original = os.path.join(data["root"], entry["original"])
+        if os.path.lexists(original):
+            failed.append(original)
+        else:
+            moves.append((os.path.join(trash, entry["quarantined"]), original))
+    moved, move_failed = _move_files(moves)
+    return [d for _, d in moved], failed + move_failed
+
+
+def git_blob_id(path: str, hash_size: int = 20) -> bytes:
+    # Object id git would give the file's content, comparable to the ids stored in the index.
+    digest = hashlib.sha1 if hash_size == 20 else hashlib.sha256
+    with open(path, "rb") as file:
+        blob = digest(b"blob %d\0" % os.fstat(file.fileno()).st_size)
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            blob.update(chunk)
+    return blob.digest()
+
+
+def plan_relinks(scanner: OrphanScanner) -> tuple:
+    # Pairs every orphaned sidecar with a source file that has no sidecar. The old source is usually
+    # still in the git index, so its size and object id identify the moved file even when it was
+    # renamed; fingerprints are only computed for files of the right type and size. Without git, a
+    # single file with the same name elsewhere is taken. Returns (proposals, unmatched) where
+    # proposals are (sidecar, new sidecar path, reason) and unmatched are (sidecar, reason).
+    root = scanner.root
+    orphans = []
+    lonely = {}
+    for path, rel, files in scanner.walk():
+        names = set(files)
+        for name in files:
+            if name.endswith(UID_SUFFIX):
+                if len(name) > len(UID_SUFFIX) and name[: -len(UID_SUFFIX)] not in names:
+                    orphans.append(rel + name)
+            elif name + UID_SUFFIX not in names:
+                lonely.setdefault(name, []).append(rel + name)
+    orphans.sort()
+
+    def full(rel: str) -> str:
+        return os.path.join(root, *rel.split("/"))
+
+    # Size and object id of the old sources, when git still knows them.
+    known = {}
+    hash_size = 20
+    checkout = find_git_checkout(root)
+    if checkout is not None and orphans:
+        top, git_dir = checkout
+        prefix = os.path.relpath(os.path.realpath(root), top).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        wanted = {prefix + rel[: -len(UID_SUFFIX)] for rel in orphans}
+        hash_size = _git_hash_size(git_dir)
+        try:
+            for path, size, object_id in read_git_index(os.path.join(git_dir, "index"), hash_size):
+                if path in wanted:
+                    known[path[len(prefix) :]] = (size, object_id)
+        except (OSError, ValueError, struct.error):
+            known.clear()
+
+    by_extension = {}
+    sizes = {}
+    fingerprints = {}
+
+    def same_content(rel: str, size: int, object_id: bytes) -> bool:
+        if rel not in sizes:
+            try:
+                sizes[rel] = os.stat(full(rel)).st_size
+            except OSError:
+                sizes[rel] = -1
+        if sizes[rel] != size:
+            return False
+        if rel not in fingerprints:
+            try:
+                fingerprints[rel] = git_blob_id(full(rel), hash_size)
+            except OSError:
+                fingerprints[rel] = b""
+        return fingerprints[rel] == object_id
+
+    proposals, unmatched = [], []
+    claimed = set()
+    for sidecar in orphans:
+        source = sidecar[: -len(UID_SUFFIX)]
+        name = posixpath.basename(source)
+        candidates = [c for c in lonely.get(name, ()) if c not in claimed]
+        target, reason = None, None
+        if source in known:
+            size, object_id = known[source]
+            matches = [c for c in candidates if same_content(c, size, object_id)]
+            if not matches:
+                # Renamed as well as moved: any file of the same type and size may be it.
+                extension = posixpath.splitext(name)[1]
+                if extension not in by_extension:
+                    by_extension[extension] = [
+                        rel for other, rels in lonely.items() if other.endswith(extension) for rel in rels
+                    ]
+                matches = [
+                    c for c in by_extension[extension] if c not in claimed and same_content(c, size, object_id)
+                ]
+            if len(matches) == 1:
+                target, reason = matches[0], "same content"
+        if target is None and len(candidates) == 1:
+            target, reason = candidates[0], "same name"
+        if target is None:
+            unmatched.append((full(sidecar), "ambiguous" if len(candidates) > 1 else "no candidate"))
+            continue
+        claimed.add(target)
+        proposals.append((full(sidecar), full(target + UID_SUFFIX), reason))
+    return proposals, unmatched
+
+
+def apply_relinks(proposals) -> tuple:
+    # The sidecar keeps its content, so every ext_resource referencing the uid resolves to the new path.
+    moved, failed = _move_files([(sidecar, destination) for sidecar, destination, _ in proposals])
+    return moved, failed
+
+
+ProjectResult = collections.namedtuple(
+    "ProjectResult", ("root", "orphans", "directories", "files", "elapsed", "source", "reused", "rescanned")
+)
+
+
+def discover_projects(paths, excludes=DEFAULT_EXCLUDES, workers: int = 1, git: bool = False) -> list:
+    # Every directory below paths holding a project.godot, in walk order.
+    found = []
+    for path in paths:
+        for directory, _, files in OrphanScanner(path, excludes, workers, git=git).walk():
+            if PROJECT_FILE in files:
+                found.append(os.path.normpath(directory))
+    return list(dict.fromkeys(found))
+
+
+def nested_roots(root: str, roots) -> list:
+    # Other roots inside root, as exclude globs, so each project's files are only counted once.
+    root = os.path.abspath(root)
+    nested = []
+    for other in roots:
+        other = os.path.abspath(other)
+        if other != root and other.startswith(root + os.sep):
+            nested.append(glob.escape(os.path.relpath(other, root).replace(os.sep, "/")))
+    return nested
+
+
+def scan_project(
+    root: str,
+    excludes=DEFAULT_EXCLUDES,
+    workers: int = 1,
+    cache: str = None,
+    rebuild_cache: bool = False,
+    git: bool = False,
+    untracked: bool = False,
+) -> ProjectResult:
+    index = None
+    if cache or rebuild_cache:
+        index = DirectoryIndex(os.path.join(root, cache or DEFAULT_CACHE_PATH), root, excludes, rebuild_cache)
+    scanner = OrphanScanner(root, excludes, workers, index, git, untracked)
+    orphans = list(scanner.iter_orphans())
+    stats = scanner.stats
+    return ProjectResult(
+        root, orphans, stats.directories, stats.files, stats.elapsed, scanner.source, stats.reused, stats.rescanned
+    )
+
+
+def scan_projects(roots, excludes=DEFAULT_EXCLUDES, jobs: int = None, **options):
+    # Scans each root in its own process and yields ProjectResults in the order of roots. Projects
+    # nested in another root are left out of the outer scan.
+    roots = list(roots)
+    arguments = [(root, [*excludes, *nested_roots(root, roots)]) for root in roots]
+    if jobs == 1 or len(roots) <= 1:
+        for root, project_excludes in arguments:
+            yield scan_project(root, project_excludes, **options)
+        return
+    with ProcessPoolExecutor(max(1, min(jobs or os.cpu_count() or 1, len(roots)))) as pool:
+        futures = [pool.submit(scan_project, root, project_excludes, **options) for root, project_excludes in arguments]
+        for future in futures:
+            yield future.result()
+
+
+def quarantine_excludes(roots, quarantine: str) -> list:
+    # Globs keeping the scan out of a quarantine folder inside a project, whose sidecars are orphans by design.
+    patterns = []
+    for root in roots:
+        trash = os.path.relpath(os.path.join(os.path.abspath(root), quarantine), os.path.abspath(root))
+        if trash != os.curdir and not trash.startswith(os.pardir):
+            patterns.append(glob.escape(trash.replace(os.sep, "/")))
+    return sorted(set(patterns))
+
+
+def remove_orphans(root: str, orphans, quarantine: str = None) -> tuple:
+    # Deletes, or quarantines below root, one project's orphans. Returns (removed, failed, manifest).
+    if not quarantine:
+        return (*remove_files(orphans), None)
+    trash = os.path.join(root, quarantine)
+    if quarantine == DEFAULT_QUARANTINE_PATH:
+        trash = os.path.join(trash, time.strftime("%Y%m%d-%H%M%S"))
+    manifest, failed = quarantine_files(orphans, root, trash)
+    failed_set = set(failed)
+    return [f for f in orphans if f not in failed_set], failed, manifest
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Find .uid files whose source file no longer exists.")
+    parser.add_argument(
+        "roots",
+        nargs="*",
+        metavar="root",
+        help="project directories to scan, several are scanned in parallel (default: the project holding this script)",
+    )
+    parser.add_argument(
+        "--discover",
+        action="store_true",
+        help="scan every directory with a project.godot found below the given roots",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="skip entries whose name or relative path matches GLOB, can be repeated",
+    )
+    parser.add_argument(
+        "--no-default-excludes",
+        action="store_true",
+        help=f"also scan {', '.join(DEFAULT_EXCLUDES)}",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="list directories with N threads, useful on network or overlay filesystems (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="report directories/sec and files/sec once the scan finishes",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+        help="reuse directory listings whose mtime did not change since the last run, "
+        "stored in PATH relative to the root (default: %(const)s)",
+    )
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="ignore the stored listings and rescan everything",
+    )
+    parser.add_argument(
+        "--git",
+        action="store_true",
+        help="read the file list from the git index instead of walking the tree, "
+        "falling back to the walk outside of a checkout",
+    )
+    parser.add_argument(
+        "--untracked",
+        action="store_true",
+        help="with --git, also include untracked files that are not ignored (runs git ls-files)",
+    )
+    parser.add_argument(
+        "--registry",
+        action="store_true",
+        help="index every uid:// declaration and reference, then report duplicate uids, "
+        "dangling references and sidecars nobody references",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="processes used to scan projects or parse scenes and resources (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--check-paths",
+        action="store_true",
+        help="report res:// paths in scenes, resources, shader includes and project.godot that do not resolve",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text", "json", "ndjson"),
+        default="text",
+        help="how orphans of a plain scan are written to stdout, streamed as they are found (default: %(default)s)",
+    )
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="only report, never prompt or remove anything",
+    )
+    action.add_argument(
+        "-y",
+        "--yes",
+        action="store_true",
+        help="remove (or quarantine) orphans without asking",
+    )
+    parser.add_argument(
+        "--quarantine",
+        nargs="?",
+        const=DEFAULT_QUARANTINE_PATH,
+        metavar="DIR",
+        help="move orphans into DIR relative to the root with a restore manifest instead of deleting them "
+        "(default: %(const)s/<timestamp>)",
+    )
+    parser.add_argument(
+        "--restore",
+        metavar="MANIFEST",
+        help="move the files listed in a quarantine manifest back and exit",
+    )
+    parser.add_argument(
+        "--relink",
+        action="store_true",
+        help="instead of deleting orphans, move each next to its moved or renamed source file",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and report orphans as they appear and disappear (inotify, or polling elsewhere)",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="with --watch, poll directory mtimes instead of using inotify",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.2,
+        metavar="SECONDS",
+        help="with --watch, quiet period that ends a burst of events (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    if args.format != "text" and (args.registry or args.check_paths or args.relink or args.watch):
+        # Only the orphan scan has a machine readable form.
+        parser.error(f"--format {args.format} cannot be combined with --registry, --check-paths, --relink or --watch")
+    if not args.roots:
+        args.roots = [DEFAULT_ROOT]
+    return args
+
+
+def run_relink(args, scanner: OrphanScanner, reporter: OrphanReporter, interactive: bool) -> int:
+    proposals, unmatched = plan_relinks(scanner)
+    for sidecar, destination, reason in proposals:
+        reporter.info(f"Relink {sidecar} -> {destination} ({reason})")
+    for sidecar, reason in unmatched:
+        reporter.info(f"No new location for {sidecar} ({reason})")
+    apply = args.yes
+    while interactive and proposals:
+        r = input("Relink y/n?")
         if r == 'y':
-            for file in duplicates:
-                os.remove(file)
-            print("Orphaned uids deleted.")
+            apply = True
             break
         elif r == 'n':
-            print("Not deleted.")
             break
         else:
             print("Invalid answer.")
-else:
-    print("No duplicates found.")
-input("press Enter to exit...")
+    moved, failed = [], []
+    if apply and proposals:
+        moved, failed = apply_relinks(proposals)
+        reporter.info(f"Relinked {len(moved)} sidecars.")
+        for file in failed:
+            reporter.info(f"Could not move: {file}")
+    if interactive:
+        input("press Enter to exit...")
+    return EXIT_FOUND if unmatched or len(moved) < len(proposals) else EXIT_CLEAN
+
+
+def run_projects(args, excludes, reporter: OrphanReporter, interactive: bool) -> int:
+    if not args.roots:
+        # --discover found nothing below the given roots.
+        reporter.info("Scanned 0 projects.")
+        reporter.summary(removed=0, failed=0, manifests=[], projects=0, elapsed=0.0)
+        if interactive:
+            input("press Enter to exit...")
+        return EXIT_CLEAN
+    started = time.perf_counter()
+    results = []
+    options = dict(
+        workers=args.workers, cache=args.cache, rebuild_cache=args.rebuild_cache, git=args.git, untracked=args.untracked
+    )
+    for result in scan_projects(args.roots, excludes, args.jobs, **options):
+        for file in result.orphans:
+            reporter.orphan(file)
+        reporter.info(
+            f"{result.root}: {len(result.orphans)} orphaned, {result.directories} directories, "
+            f"{result.files} files in {result.elapsed:.3f}s ({result.source})"
+        )
+        results.append(result)
+    elapsed = time.perf_counter() - started
+    files = sum(r.files for r in results)
+    reporter.info(
+        f"Scanned {len(results)} projects, {sum(r.directories for r in results)} directories and {files} files "
+        f"in {elapsed:.3f}s wall, {sum(r.elapsed for r in results):.3f}s summed, {files / max(elapsed, 1e-9):.0f} files/s"
+    )
+
+    found = sum(len(r.orphans) for r in results)
+    remove = args.yes
+    if found:
+        reporter.info(f"Found {found} orphaned.")
+        while interactive:
+            r = input("Quarantine y/n?" if args.quarantine else "Delete y/n?")
+            if r == 'y':
+                remove = True
+                break
+            elif r == 'n':
+                break
+            else:
+                print("Invalid answer.")
+    else:
+        reporter.info("No orphaned uids found.")
+
+    removed, failed, manifests = 0, 0, []
+    if remove:
+        for result in results:
+            if not result.orphans:
+                continue
+            project_removed, project_failed, manifest = remove_orphans(result.root, result.orphans, args.quarantine)
+            removed += len(project_removed)
+            failed += len(project_failed)
+            for file in project_failed:
+                reporter.info(f"Could not remove: {file}")
+            if manifest:
+                manifests.append(manifest)
+        reporter.info(f"{'Quarantined' if args.quarantine else 'Deleted'} {removed} orphaned uids.")
+    elif found:
+        reporter.info("Not deleted.")
+    reporter.summary(removed=removed, failed=failed, manifests=manifests, projects=len(results), elapsed=elapsed)
+
+    if interactive:
+        input("press Enter to exit...")
+    return EXIT_FOUND if found > removed else EXIT_CLEAN
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.restore:
+        restored, failed = restore_quarantine(args.restore)
+        print(f"Restored {len(restored)} files.")
+        for file in failed:
+            print(f"Could not restore: {file}", file=sys.stderr)
+        return EXIT_FOUND if failed else EXIT_CLEAN
+
+    reporter = OrphanReporter(args.format)
+    # Without a terminal nobody can answer the prompt, so the default becomes a dry run.
+    interactive = not (args.dry_run or args.yes or args.format != "text") and sys.stdin.isatty()
+    excludes = list(args.exclude) if args.no_default_excludes else [*DEFAULT_EXCLUDES, *args.exclude]
+    if args.discover:
+        args.roots = discover_projects(args.roots, excludes, args.workers, args.git)
+        reporter.info(f"Discovered {len(args.roots)} projects.")
+    if args.quarantine:
+        excludes += quarantine_excludes(args.roots, args.quarantine)
+    if len(args.roots) != 1:
+        if args.registry or args.check_paths or args.relink or args.watch:
+            reporter.info("--registry, --check-paths, --relink and --watch take exactly one root.")
+            return EXIT_USAGE
+        return run_projects(args, excludes, reporter, interactive)
+    args.root = args.roots[0]
+    index = None
+    if args.cache or args.rebuild_cache:
+        cache_path = os.path.join(args.root, args.cache or DEFAULT_CACHE_PATH)
+        index = DirectoryIndex(cache_path, args.root, excludes, args.rebuild_cache)
+        if index.invalidated:
+            reporter.info(f"Cache: rebuilding ({index.invalidated})")
+    scanner = OrphanScanner(args.root, excludes, args.workers, index, args.git, args.untracked)
+
+    if args.registry:
+        uid_cache = None
+        if index is not None:
+            uid_cache = UidFileCache(index.path, args.root, args.rebuild_cache)
+        registry = build_uid_registry(scanner, args.jobs, uid_cache)
+        print_uid_registry(registry)
+        return EXIT_FOUND if registry.duplicates() or registry.dangling() else EXIT_CLEAN
+    if args.check_paths:
+        broken = check_res_paths(scanner, args.jobs)
+        print_broken_res_paths(broken)
+        return EXIT_FOUND if broken else EXIT_CLEAN
+    if args.relink:
+        return run_relink(args, scanner, reporter, interactive)
+    if args.watch:
+        watcher = OrphanWatcher(scanner, args.debounce, poll=args.poll)
+        print(f"Watching {scanner.root} ({watcher.mode}), press Ctrl+C to stop.")
+        try:
+            watcher.run(print_orphan_changes)
+        except KeyboardInterrupt:
+            print(f"Stopped with {len(watcher.orphans)} orphaned uids.")
+        return EXIT_CLEAN
+
+    orphaned = []
+    for file in scanner.iter_orphans():
+        reporter.orphan(file)
+        orphaned.append(file)
+    if scanner.git:
+        reporter.info(f"Source: {scanner.source} ({scanner.source_note})")
+    if args.benchmark:
+        reporter.info(f"{scanner.stats.report()} using {scanner.workers} worker(s)")
+    if index is not None and scanner.source == "filesystem":
+        reporter.info(scanner.stats.cache_report())
+
+    remove = args.yes
+    if orphaned:
+        reporter.info(f"Found {len(orphaned)} orphaned.")
+        while interactive:
+            r = input("Quarantine y/n?" if args.quarantine else "Delete y/n?")
+            if r == 'y':
+                remove = True
+                break
+            elif r == 'n':
+                break
+            else:
+                print("Invalid answer.")
+    else:
+        reporter.info("No orphaned uids found.")
+
+    removed, failed, manifest = [], [], None
+    if remove and orphaned:
+        removed, failed, manifest = remove_orphans(args.root, orphaned, args.quarantine)
+        if manifest:
+            reporter.info(f"Quarantined {len(removed)} orphaned uids, restore with --restore {manifest}")
+        else:
+            reporter.info(f"Deleted {len(removed)} orphaned uids.")
+        for file in failed:
+            reporter.info(f"Could not remove: {file}")
+    elif orphaned:
+        reporter.info("Not deleted.")
+    reporter.summary(removed=len(removed), failed=len(failed), manifest=manifest, source=scanner.source)
+
+    if interactive:
+        input("press Enter to exit...")
+    return EXIT_FOUND if len(orphaned) > len(removed) else EXIT_CLEAN
+
+
+if __name__ == "__main__":
+    sys.exit(main())
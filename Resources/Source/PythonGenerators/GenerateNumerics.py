@@ -1,51 +1,252 @@
-# OLD and not used anymore since GodotSupport now can support .net 8.0 with INumber<N>.
+# Generates the fixed type vectors (Int2, Float3, Byte4...) and, with --specialize, int, float and
+# double specializations of the generic Vec2/3/4<N> in Support/Numerics. When the specializations
+# are present, SupportGodot.csproj runs --check-parity before compiling. See --help for the other checks.
 
+import argparse
+import contextlib
+import difflib
+import hashlib
+import io
+import itertools
+import json
+import math
+import os
+import re
+import string
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TextIO
 
 USING = (
     "using Godot;",
     "using System;",
+    "using System.Collections.Generic;",
     "using System.Diagnostics;",
     "using System.Runtime.CompilerServices;",
 )
 IDENTATION = "    "
 NAMESPACE = "namespace Support.Numerics;"
 NEWLINE = "\n"
-TYPES = ("int", "float", "double", "bool")
-CAP_TYPES = tuple(t.capitalize() for t in TYPES)
+TYPES = ("int", "float", "double", "bool", "Half", "byte", "sbyte", "short", "ushort", "bool")
+# Spelled out, capitalize() would give Sbyte and Ushort. The last one is the bit packed bool.
+CAP_TYPES = ("Int", "Float", "Double", "Bool", "Half", "Byte", "SByte", "Short", "UShort", "PackedBool")
+# Element types C# promotes to int in arithmetic, the results are cast back.
+PROMOTED_TYPES = ("byte", "sbyte", "short", "ushort")
+# Promoted types whose squared lengths and distances do not fit an int either.
+WIDE_MAGNITUDE_TYPES = ("short", "ushort")
+UNSIGNED_TYPES = ("byte", "ushort")
+# Where Abs, Min, Max and Clamp live for each element type.
+MATH_CLASSES = ("Mathf", "Mathf", "Mathf", None, "Half", "Math", "Math", "Math", "Math", None)
 VECTOR_LETTERS = ("x", "y", "z", "w")
 FIRST_VECTOR_ARG = "v1"
 SECOND_VECTOR_ARG = "v2"
 SINGLE_VECTOR_ARG = "v"
 NUMERIC_ARG = "n"
 COMA = ", "
+NUMERIC_USING = ("using System.Runtime.InteropServices;",)
+SIMD_USING = ("using System.Runtime.Intrinsics;",)
+# (typeId, vectorSize) with a Vector128 path, the 3 wide ones are padded with a zero lane.
+SIMD_UNITS = ((0, 3), (0, 4), (1, 3), (1, 4), (2, 2))
+SIMD_CHECK = "Vector128.IsHardwareAccelerated"
+# Which named swizzle properties are generated: none, only those without a
+# repeated component (the ones with a setter) or every combination.
+SWIZZLE_MODES = ("none", "permutations", "all")
 FOLDER = Path(__file__).parent
+# The generic Vec2/3/4<N> the specializations are rewritten from, and the
+# typeIds they are emitted for.
+GENERIC_FOLDER = FOLDER.parent / "Support" / "Numerics"
+SPECIALIZED_TYPES = (0, 1, 2)
+MANIFEST = ".generated_numerics.json"
+# Committed reference output, one folder per option set. The suffix keeps
+# them out of the C# build and the .gdignore out of the Godot import.
+GOLDEN_FOLDER = FOLDER / "Golden"
+GOLDEN_SUFFIX = ".golden"
+DEFAULT_OPTIONS = {"simd": False, "swizzles": "all"}
+# Buffered characters before an emitter with a stream flushes to it.
+FLUSH_SIZE = 1 << 16
+FORMATTER = string.Formatter()
+# Methods of the generators measured by the profiler, the rest is counted as "other".
+SECTIONS = (
+    "write_properties",
+    "write_swizzles",
+    "write_constructors",
+    "write_math_operators",
+    "write_logical_operators",
+    "write_object_operators",
+    "write_functions",
+    "write_in_place",
+    "write_converters",
+    "write_bulk",
+    "write_span_converters",
+)
+# System.Numerics.Vector is spelled out, Godot has its own Vector2/3/4.
+NUMERICS_VECTOR = "System.Numerics.Vector"
+# Bits of the integer element types and the unsigned type of the same width.
+# Integer vectors hash by packing their components into 64 bit words.
+INTEGER_BITS = {"int": 32, "byte": 8, "sbyte": 8, "short": 16, "ushort": 16}
+UNSIGNED_OF = {"int": "uint", "sbyte": "byte", "short": "ushort"}
+# The MurmurHash3 64 bit finalizer, alternating xor shifts and multipliers,
+# every word of a vector is folded in through it.
+HASH_MIX = (33, 0xFF51AFD7ED558CCD, 33, 0xC4CEB9FE1A85EC53, 33)
+# Integer types of the C# arithmetic the generated expressions are checked with, (bits, signed).
+CS_INTEGERS = {
+    "byte": (8, False),
+    "sbyte": (8, True),
+    "short": (16, True),
+    "ushort": (16, False),
+    "int": (32, True),
+    "uint": (32, False),
+    "long": (64, True),
+    "ulong": (64, False),
+}
+# Vectors whose squares or differences wrap when computed in the element
+# type or an int, (element type, components, other components).
+ARITHMETIC_CASES = (
+    ("byte", (5, 0), (3, 0)),
+    ("byte", (255, 255, 255, 255), (0, 0, 0, 0)),
+    ("sbyte", (-100, 0), (100, 0)),
+    ("sbyte", (-128, -128, -128), (127, 127, 127)),
+    ("ushort", (20, 0), (10, 0)),
+    ("ushort", (65535, 65535), (0, 0)),
+    ("short", (-32768, 32767, -32768), (32767, -32768, 32767)),
+    ("short", (-32768, -32768, -32768, -32768), (0, 0, 0, 0)),
+)
+# Keys hashed per integer vector and key pattern by --hash-check, and how
+# far it may stray from an ideal random hash. Besides cubes around zero and
+# at the ends of the range, grids spaced by these powers of two are hashed,
+# which leave the low bits of every component constant.
+HASH_CHECK_KEYS = 1 << 18
+HASH_CHECK_STRIDES = (1 << 2, 1 << 4, 1 << 8, 1 << 16, 1 << 24)
+HASH_COLLISION_SLACK = 2.0
+HASH_EMPTY_SLACK = 0.02
+
+
+class Emitter:
+    # Collects generated text as chunks instead of one growing string,
+    # optionally streaming them to a file once enough is buffered.
+    def __init__(self, stream: TextIO = None, flushSize: int = FLUSH_SIZE):
+        self.stream = stream
+        self.flushSize = flushSize
+        self.chunks = []
+        self.size = 0
+        self.prefixes = [""]
+        self.newlines = ["", NEWLINE]
+
+    def prefix(self, level: int) -> str:
+        while len(self.prefixes) <= level:
+            self.prefixes.append(self.prefixes[-1] + IDENTATION)
+        return self.prefixes[level]
+
+    def write(self, level: int, line: str, newlines: int = 1):
+        while len(self.newlines) <= newlines:
+            self.newlines.append(self.newlines[-1] + NEWLINE)
+        chunk = self.prefix(level) + line + self.newlines[newlines]
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        if self.stream is not None and self.size >= self.flushSize:
+            self.flush()
+
+    def flush(self):
+        if self.stream is None:
+            return
+        self.stream.write("".join(self.chunks))
+        self.chunks.clear()
+        self.size = 0
+
+    def getvalue(self) -> str:
+        if self.stream is not None:
+            raise ValueError("Emitter output was streamed to a file")
+        if len(self.chunks) > 1:
+            self.chunks[:] = ["".join(self.chunks)]
+        return self.chunks[0] if self.chunks else ""
+
+
+class Template:
+    # A str.format template parsed once. Templates with plain fields only are
+    # turned into a printf style string, which renders in a single C call.
+    def __init__(self, piece: str):
+        self.parts = tuple(FORMATTER.parse(piece))
+        self.printf = None
+        if all(not spec and not conversion for _, _, spec, conversion in self.parts):
+            self.printf = "".join(
+                literal.replace("%", "%%") + ("" if field is None else f"%({field})s")
+                for literal, field, _, _ in self.parts
+            )
+
+    def render(self, context: dict) -> str:
+        if self.printf is not None:
+            return self.printf % context
+        out = []
+        for literal, field, spec, conversion in self.parts:
+            out.append(literal)
+            if field is not None:
+                value = FORMATTER.convert_field(context[field], conversion)
+                out.append(format(value, spec))
+        return "".join(out)
+
+
+# Compiled templates by template string, generated sequences by
+# (template, separator, size, typeId, vectorSize, additional arguments).
+TEMPLATES = {}
+SEQUENCES = {}
+
+
+def compile_template(piece: str) -> Template:
+    template = TEMPLATES.get(piece)
+    if template is None:
+        template = TEMPLATES[piece] = Template(piece)
+    return template
+
+
+def clear_template_caches():
+    TEMPLATES.clear()
+    SEQUENCES.clear()
 
 
 class BaseGenerator:
-    def __init__(self, typeId: int, vectorSize: int):
+    def __init__(
+        self, typeId: int, vectorSize: int, stream: TextIO = None, simd: bool = False, swizzles: str = "all"
+    ):
         self.typeId = typeId
         self.vectorSize = vectorSize
-        self.result = ""
+        self.simd = simd and (typeId, vectorSize) in SIMD_UNITS
+        self.swizzles = swizzles
+        self.emitter = Emitter(stream)
         self.identation = 0
         self.lastRegion = ""
+        self.contexts = None
+
+    @property
+    def result(self) -> str:
+        return self.emitter.getvalue()
 
     def write(self, line: str, newlines: int = 1):
-        self.result += f"{IDENTATION * self.identation}{line}{NEWLINE * newlines}"
+        self.emitter.write(self.identation, line, newlines)
+
+    def gen_context(self, i: int) -> dict:
+        # The fields every template can use, built once per vector letter.
+        if self.contexts is None:
+            base = {
+                "NL": NEWLINE,
+                "T": self.gen_vector_type(),
+                "BT": self.gen_vector_type(0, 3),
+                "NT": self.gen_numeric_type(),
+                "VA1": FIRST_VECTOR_ARG,
+                "VA2": SECOND_VECTOR_ARG,
+                "VA": SINGLE_VECTOR_ARG,
+                "NA": NUMERIC_ARG,
+            }
+            self.contexts = [dict(base, L=letter) for letter in VECTOR_LETTERS]
+        return self.contexts[i]
 
     def gen_format(self, piece: str, i: int = 0, **additional):
-        return piece.format(
-            NL=NEWLINE,
-            L=VECTOR_LETTERS[i],
-            T=self.gen_vector_type(),
-            BT=self.gen_vector_type(0, 3),
-            NT=self.gen_numeric_type(),
-            VA1=FIRST_VECTOR_ARG,
-            VA2=SECOND_VECTOR_ARG,
-            VA=SINGLE_VECTOR_ARG,
-            NA=NUMERIC_ARG,
-            **additional,
-        )
+        context = self.gen_context(i)
+        if additional:
+            context = {**context, **additional}
+        return compile_template(piece).render(context)
 
     def write_ident(self):
         self.write("{")
@@ -62,6 +263,31 @@ class BaseGenerator:
     def write_region_end(self):
         self.write(f"#endregion {self.lastRegion}")
 
+    def write_block(self, header: str):
+        self.write(header)
+        self.write_ident()
+
+    def write_loop(self, header: str, body: str):
+        self.write_block(header)
+        self.write(body)
+        self.write_unident()
+
+    def write_check(self, condition: str, message: str):
+        self.write(f'if ({condition}) throw new ArgumentException("{message}");')
+
+    def write_flatten(self, *names, typeId: int = None):
+        # Views of spans of vectors as spans of their components.
+        for name, span in names:
+            self.write(
+                self.gen_format(
+                    "var {N} = MemoryMarshal.Cast<{VT}, {CT}>({S});",
+                    N=name,
+                    S=span,
+                    VT=self.gen_vector_type(0, typeId),
+                    CT=TYPES[self.typeId if typeId is None else typeId],
+                )
+            )
+
     def write_inline_tip(self):
         self.write("[MethodImpl(MethodImplOptions.AggressiveInlining)]")
 
@@ -76,9 +302,15 @@ class BaseGenerator:
     ) -> str:
         if size == 0:
             size = self.vectorSize
-        return separator.join(
-            self.gen_format(piece, i, **additional) for i in range(size)
-        )
+        # The class is part of the key, GenerateSpecialization names its
+        # vectors differently for the same typeId and vectorSize.
+        key = (type(self), piece, separator, size, self.typeId, self.vectorSize, *sorted(additional.items()))
+        sequence = SEQUENCES.get(key)
+        if sequence is None:
+            sequence = SEQUENCES[key] = separator.join(
+                self.gen_format(piece, i, **additional) for i in range(size)
+            )
+        return sequence
 
     def gen_vector_type(self, size: int = 0, typeId: int = None):
         if size == 0:
@@ -90,6 +322,21 @@ class BaseGenerator:
     def gen_numeric_type(self):
         return TYPES[self.typeId]
 
+    def is_promoted(self) -> bool:
+        return TYPES[self.typeId] in PROMOTED_TYPES
+
+    def gen_cast(self, piece: str) -> str:
+        # Wraps an arithmetic template so byte and short results, promoted to
+        # int by C#, are cast back to the element type.
+        return f"({{NT}})({piece})" if self.is_promoted() else piece
+
+    def gen_magnitude_type(self) -> str:
+        # Squared lengths of byte and short vectors do not fit their elements,
+        # those of short vectors not even an int.
+        if self.gen_numeric_type() in WIDE_MAGNITUDE_TYPES:
+            return "long"
+        return "int" if self.is_promoted() else self.gen_numeric_type()
+
     def write_func_header(
         self,
         name: str,
@@ -115,19 +362,6 @@ class BaseGenerator:
             )
         )
 
-    def write_array_getter_header(
-        self, returnType: str, args: str = "", body: str = None, readonly: bool = False
-    ):
-        self.write(
-            self.gen_format(
-                "public {RO}{RT} this[{ARGS}]{BODY}",
-                RO="readonly " if readonly else "",
-                RT=returnType,
-                ARGS=args,
-                BODY=f" => {body}" if body is not None else "",
-            )
-        )
-
     def write_object_operators(self):
         self.write_region_start("OBJECT_OPERATORS")
         self.write_inline_tip()
@@ -143,7 +377,7 @@ class BaseGenerator:
         self.write_inline_tip()
         self.write_func_header(
             "Equals",
-            self.gen_sequence("{L} == {VA}.{L}", " && ") + ";",
+            self.gen_equality(),
             self.gen_format("{T} {VA}"),
             "bool",
             False,
@@ -153,7 +387,7 @@ class BaseGenerator:
         self.write_inline_tip()
         self.write_func_header(
             "GetHashCode",
-            f"HashCode.Combine({self.gen_sequence()});",
+            self.gen_hash(),
             "",
             "int",
             False,
@@ -169,14 +403,90 @@ class BaseGenerator:
             True,
             True,
         )
+        if self.is_integer():
+            self.write_hash_mix()
+        self.write_key_comparer()
         self.write_region_end()
 
+    def is_integer(self) -> bool:
+        return self.gen_numeric_type() in INTEGER_BITS
+
+    def gen_equality(self) -> str:
+        # Integer vectors compare every bit at once, either as one unsigned
+        # value of their whole size or by or-ing the xor of each component.
+        if not self.is_integer():
+            return self.gen_sequence("{L} == {VA}.{L}", " && ") + ";"
+        size = INTEGER_BITS[self.gen_numeric_type()] * self.vectorSize
+        whole = {16: "ushort", 32: "uint", 64: "ulong"}.get(size)
+        if whole is None:
+            return f"({self.gen_sequence('{L} ^ {VA}.{L}', ' | ')}) == 0;"
+        return self.gen_format(
+            "Unsafe.As<{T}, {W}>(ref Unsafe.AsRef(in this)) == Unsafe.As<{T}, {W}>(ref {VA});", W=whole
+        )
+
+    def gen_hash(self) -> str:
+        # Floating point components keep HashCode.Combine, -0 and 0 are equal
+        # but differ in their bits.
+        if not self.is_integer():
+            return f"HashCode.Combine({self.gen_sequence()});"
+        numeric = self.gen_numeric_type()
+        bits = INTEGER_BITS[numeric]
+        unsigned = f"({UNSIGNED_OF[numeric]})" if numeric in UNSIGNED_OF else ""
+        words = []
+        for word in hash_words(numeric, self.vectorSize):
+            words.append(
+                " | ".join(
+                    f"(ulong){unsigned}{VECTOR_LETTERS[i]}" + (f" << {bits * j}" if j else "")
+                    for j, i in enumerate(word)
+                )
+            )
+        body = f"Mix({words[0]})"
+        for word in words[1:]:
+            body = f"Mix({body} ^ ({word}))" if " | " in word else f"Mix({body} ^ {word})"
+        return f"(int){body};"
+
+    def write_hash_mix(self):
+        self.write_inline_tip()
+        self.write_block("private static ulong Mix(ulong h)")
+        for i, step in enumerate(HASH_MIX[:-1]):
+            self.write(f"h ^= h >> {step};" if i % 2 == 0 else f"h *= 0x{step:X}UL;")
+        self.write(f"return h ^ h >> {HASH_MIX[-1]};")
+        self.write_unident()
+
+    def write_key_comparer(self):
+        # A sealed comparer the JIT can devirtualize, for dictionaries keyed
+        # by vectors, e.g. new Dictionary<Int2, V>(Int2.KeyComparer.Instance).
+        self.write_block(self.gen_format("public sealed class KeyComparer : IEqualityComparer<{T}>"))
+        self.write("public static readonly KeyComparer Instance = new();")
+        self.write("private KeyComparer() { }")
+        self.write_inline_tip()
+        self.write(self.gen_format("public bool Equals({T} a, {T} b) => a.Equals(b);"))
+        self.write_inline_tip()
+        self.write(self.gen_format("public int GetHashCode({T} {VA}) => {VA}.GetHashCode();"))
+        self.write_unident()
+
+    def gen_simd(self, vectorized: str, scalar: str) -> str:
+        # The scalar body, behind a Vector128 path when the type has one.
+        if not self.simd:
+            return scalar
+        return f"{SIMD_CHECK} ? {vectorized} : {scalar}"
+
+    def is_simd_operator(self, signal: str) -> bool:
+        # Integer division has no hardware instruction, % has none at all.
+        return signal in ("+", "-", "*") or (signal == "/" and self.typeId in (1, 2))
+
     def write_operator_function1(self, signal: str):
         self.write_inline_tip()
-        body_sequence = self.gen_sequence("{VA}.{L} {S} {NA}", S=signal)
+        body_sequence = self.gen_sequence(self.gen_cast("{VA}.{L} {S} {NA}"), S=signal)
+        body = f"new({body_sequence})"
+        if self.is_simd_operator(signal):
+            body = self.gen_simd(
+                self.gen_format("FromVector128(AsVector128({VA}) {S} Vector128.Create({NA}))", S=signal),
+                body,
+            )
         self.write_func_header(
             f"operator {signal}",
-            f"new({body_sequence});",
+            f"{body};",
             self.gen_format("in {T} {VA}, {NT} {NA}"),
             self.gen_vector_type(),
             True,
@@ -186,10 +496,19 @@ class BaseGenerator:
 
     def write_operator_function2(self, signal: str, returnType: str):
         self.write_inline_tip()
-        body_sequence = self.gen_sequence("{VA1}.{L} {S} {VA2}.{L}", S=signal)
+        piece = "{VA1}.{L} {S} {VA2}.{L}"
+        if returnType == self.gen_vector_type():
+            piece = self.gen_cast(piece)
+        body_sequence = self.gen_sequence(piece, S=signal)
+        body = f"new({body_sequence})"
+        if returnType == self.gen_vector_type() and self.is_simd_operator(signal):
+            body = self.gen_simd(
+                self.gen_format("FromVector128(AsVector128({VA1}) {S} AsVector128({VA2}))", S=signal),
+                body,
+            )
         self.write_func_header(
             f"operator {signal}",
-            f"new({body_sequence});",
+            f"{body};",
             self.gen_format("in {T} {VA1}, in {T} {VA2}"),
             returnType,
             True,
@@ -198,23 +517,54 @@ class BaseGenerator:
         )
 
 
+def hash_words(numeric: str, vectorSize: int) -> list:
+    # Component indices packed into each 64 bit word, lowest bits first.
+    perWord = 64 // INTEGER_BITS[numeric]
+    return [list(range(i, min(i + perWord, vectorSize))) for i in range(0, vectorSize, perWord)]
+
+
+def swizzle_table(vectorSize: int, mode: str) -> list:
+    # Component indices of the named swizzles, 2 to 4 wide, in the order
+    # they are generated.
+    if mode == "none":
+        return []
+    if mode == "permutations":
+        return [p for size in range(2, 5) for p in itertools.permutations(range(vectorSize), size)]
+    return [p for size in range(2, 5) for p in itertools.product(range(vectorSize), repeat=size)]
+
+
 class GenerateNumeric(BaseGenerator):
     def generate(self):
-        self.write(NEWLINE.join(USING), 2)
+        usings = USING + NUMERIC_USING
+        self.write(NEWLINE.join(usings + SIMD_USING if self.simd else usings), 2)
         self.write(NAMESPACE, 2)
+        if self.simd:
+            # Keeps the fields in declaration order, so the struct can be
+            # reinterpreted as its Vector128.
+            self.write("[StructLayout(LayoutKind.Sequential)]")
         self.write(self.gen_format("public struct {T} : IEquatable<{T}>"))
         self.write_ident()
         self.write_properties()
         self.write_swizzles()
         self.write_constructors()
+        self.write_simd()
         self.write_math_operators()
         self.write_logical_operators()
         self.write_object_operators()
         self.write_functions()
+        self.write_in_place()
         self.write_converters()
+        self.write_bulk()
+        self.write_span_converters()
         self.write_unident()
 
     def write_properties(self):
+        def literal(value: int) -> str:
+            # Half has no implicit conversion from int literals.
+            if self.gen_numeric_type() != "Half":
+                return str(value)
+            return f"(Half){value}" if value >= 0 else f"(Half)({value})"
+
         self.write_region_start("PROPERTIES")
         for name, vx, vy in (
             ("Zero", 0, 0),
@@ -224,12 +574,14 @@ class GenerateNumeric(BaseGenerator):
             ("Left", -1, 0),
             ("Right", 1, 0),
         ):
+            if min(vx, vy) < 0 and self.gen_numeric_type() in UNSIGNED_TYPES:
+                continue
             self.write(
                 self.gen_format(
                     "public static readonly {T} {NAME} = new({VX}, {VY});",
                     NAME=name,
-                    VX=vx,
-                    VY=vy,
+                    VX=literal(vx),
+                    VY=literal(vy),
                 )
             )
         self.write(self.gen_format("public {NT} {SEQ};", SEQ=self.gen_sequence()))
@@ -246,34 +598,29 @@ class GenerateNumeric(BaseGenerator):
         self.write(
             self.gen_format(
                 "public {T}({SEQ1}) {{ {SEQ2} }}",
-                SEQ1=self.gen_sequence("{NT} {L} = 0"),
+                SEQ1=self.gen_sequence("{NT} {L} = {D}", D="default" if self.gen_numeric_type() == "Half" else 0),
                 SEQ2=self.gen_sequence("this.{L} = {L};", " "),
             )
         )
         self.write_region_end()
 
     def write_swizzles(self):
-        def write_function(size: int):
-            has_setter = size <= self.vectorSize
-            getter_body = self.gen_sequence("this[i{L}]", size=size)
-            setter_body = self.gen_sequence("this[i{L}] = value.{L};", " ", size)
+        def write_swizzle(components):
+            letters = [VECTOR_LETTERS[c] for c in components]
+            swizzleType = self.gen_vector_type(len(components))
+            name = "".join(letters)
+            getter = f"new({COMA.join(letters)})"
             self.write_hide_tip()
-            if has_setter:
-                self.write_array_getter_header(
-                    self.gen_vector_type(size),
-                    self.gen_sequence("int i{L}", size=size),
-                )
+            if len(set(components)) < len(components):
+                # repeated components, write a readonly one line getter
+                self.write(f"public readonly {swizzleType} {name} => {getter};")
+            else:
+                setter = " ".join(f"{letter} = value.{VECTOR_LETTERS[i]};" for i, letter in enumerate(letters))
+                self.write(f"public {swizzleType} {name}")
                 self.write_ident()
-                self.write(f"readonly get => new({getter_body});")
-                self.write(f"set {{ {setter_body} }}")
+                self.write(f"readonly get => {getter};")
+                self.write(f"set {{ {setter} }}")
                 self.write_unident()
-            else:
-                # write a readonly one line getter
-                self.write_array_getter_header(
-                    self.gen_vector_type(size),
-                    self.gen_sequence("int i{L}", size=size),
-                    f"new({getter_body});",
-                )
 
         self.write_region_start("SWIZZLES")
         self.write_hide_tip()
@@ -298,9 +645,52 @@ class GenerateNumeric(BaseGenerator):
         self.write_unident()
         self.write_unident()
         self.write_unident()
-        write_function(2)
-        write_function(3)
-        write_function(4)
+        for components in swizzle_table(self.vectorSize, self.swizzles):
+            write_swizzle(components)
+        self.write_region_end()
+
+    def fills_vector128(self) -> bool:
+        return self.vectorSize * (8 if self.typeId == 2 else 4) == 16
+
+    def write_simd(self):
+        if not self.simd:
+            return
+        self.write_region_start("SIMD")
+        vector = f"Vector128<{self.gen_numeric_type()}>"
+        self.write_inline_tip()
+        if self.fills_vector128():
+            # Same size as the Vector128, reinterpret it in place.
+            self.write(
+                self.gen_format(
+                    "private static {V} AsVector128(in {T} {VA}) => Unsafe.As<{T}, {V}>(ref Unsafe.AsRef(in {VA}));",
+                    V=vector,
+                )
+            )
+            self.write_inline_tip()
+            self.write(
+                self.gen_format(
+                    "private static {T} FromVector128({V} {VA}) => Unsafe.As<{V}, {T}>(ref {VA});",
+                    V=vector,
+                )
+            )
+        else:
+            # Padded with a zero lane, which every accelerated operation leaves
+            # harmless and FromVector128 drops.
+            self.write(
+                self.gen_format(
+                    "private static {V} AsVector128(in {T} {VA}) => Vector128.Create({SEQ}, 0);",
+                    V=vector,
+                    SEQ=self.gen_sequence("{VA}.{L}"),
+                )
+            )
+            self.write_inline_tip()
+            self.write(
+                self.gen_format(
+                    "private static {T} FromVector128({V} {VA}) => new({SEQ});",
+                    V=vector,
+                    SEQ=COMA.join(f"{SINGLE_VECTOR_ARG}.GetElement({i})" for i in range(self.vectorSize)),
+                )
+            )
         self.write_region_end()
 
     def write_math_operators(self):
@@ -314,7 +704,10 @@ class GenerateNumeric(BaseGenerator):
         self.write(
             self.gen_format(
                 "public static {T} operator -(in {T} v) => {BODY};",
-                BODY=self.gen_format("new({SEQ})", SEQ=self.gen_sequence("-v.{L}")),
+                BODY=self.gen_simd(
+                    self.gen_format("FromVector128(-AsVector128({VA}))"),
+                    self.gen_format("new({SEQ})", SEQ=self.gen_sequence(self.gen_cast("-v.{L}"))),
+                ),
             )
         )
         self.write_region_end()
@@ -346,16 +739,16 @@ class GenerateNumeric(BaseGenerator):
                 i -= 1
             return body + ";"
 
-        def write_inline_multiple_line(name: str, func_piece: str, args: str = ""):
+        def write_inline_multiple_line(name: str, func_piece: str, args: str = "", vectorized: str = None):
             write_inline(
                 name,
-                "new(",
+                "new(" if vectorized is None else self.gen_simd(vectorized, "new("),
                 args,
                 self.gen_vector_type(),
             )
             self.ident(1)
             for i in range(self.vectorSize):
-                f = self.gen_format(func_piece)
+                f = self.gen_format(func_piece, i)
                 self.write(
                     self.gen_format(
                         "{F}{TERM}",
@@ -365,45 +758,187 @@ class GenerateNumeric(BaseGenerator):
                 )
             self.ident(-1)
 
-        sqrt_function = "Toolbox.ISqrt" if self.typeId == 0 else "Mathf.Sqrt"
+        math = MATH_CLASSES[self.typeId]
+        magnitudeType = self.gen_magnitude_type()
+        if magnitudeType == "long":
+            sqrt_function = "(long)Math.Sqrt"
+        elif self.typeId == 0 or self.is_promoted():
+            sqrt_function = "Toolbox.ISqrt"
+        else:
+            sqrt_function = f"{math}.Sqrt"
+        # Promoted types square in the magnitude type, widened before the
+        # multiplication when an int would overflow.
+        widen = "(long)" if magnitudeType == "long" else ""
         self.write_region_start("FUNCTIONS")
-        write_inline("SqrMagnitude", self.gen_sequence("{L} * {L}", " + ") + ";")
-        write_inline("Magnitude", f"{sqrt_function}(SqrMagnitude());")
         write_inline(
-            "Normalized", "this / Magnitude();", returnType=self.gen_vector_type()
+            "SqrMagnitude",
+            self.gen_simd(
+                "Vector128.Dot(AsVector128(this), AsVector128(this))",
+                self.gen_sequence(widen + "{L} * {L}", " + "),
+            )
+            + ";",
+            returnType=magnitudeType,
         )
+        write_inline("Magnitude", f"{sqrt_function}(SqrMagnitude());", returnType=magnitudeType)
+        if self.is_promoted():
+            # Casting the magnitude down to the element type would wrap, the
+            # division runs in the promoted type instead.
+            self.write_inline_tip()
+            self.write_block(self.gen_format("public readonly {T} Normalized()"))
+            self.write("Normalize(this, out var result);")
+            self.write("return result;")
+            self.write_unident()
+        else:
+            write_inline("Normalized", "this / Magnitude();", returnType=self.gen_vector_type())
+        # Unsigned elements are their own absolute value.
+        abs_piece = "{L}" if self.gen_numeric_type() in UNSIGNED_TYPES else f"{math}.Abs({{L}})"
         write_inline(
             "Abs",
-            self.gen_format("new({SEQ})", SEQ=self.gen_sequence("Mathf.Abs({L})"))
+            self.gen_format("new({SEQ})", SEQ=self.gen_sequence(abs_piece))
             + ";",
             returnType=self.gen_vector_type(),
         )
-        write_inline("MinValue", gen_chained_func("Mathf.Min"))
-        write_inline("MaxValue", gen_chained_func("Mathf.Max"))
+        write_inline("MinValue", gen_chained_func(f"{math}.Min"))
+        write_inline("MaxValue", gen_chained_func(f"{math}.Max"))
+        # Subtracting the vectors would wrap in the element type, promoted
+        # types take the difference of each component as an int instead.
         write_inline(
             "SqrDistance",
-            "(other - this).SqrMagnitude();",
+            self.gen_sequence(widen + "(other.{L} - {L}) * (other.{L} - {L})", " + ") + ";"
+            if self.is_promoted()
+            else "(other - this).SqrMagnitude();",
             f"in {self.gen_vector_type()} other",
+            magnitudeType,
         )
         write_inline(
             "Distance",
             self.gen_format("{SQRT}(SqrDistance({VA}));", SQRT=sqrt_function),
             self.gen_format("in {SEQ} {VA}", SEQ=self.gen_vector_type()),
+            magnitudeType,
         )
         write_inline_multiple_line(
             "Min",
-            "Mathf.Min({L}, {VA}.{L})",
+            f"{math}.Min({{L}}, {{VA}}.{{L}})",
             self.gen_format("in {T} {VA}"),
+            self.gen_format("FromVector128(Vector128.Min(AsVector128(this), AsVector128({VA})))"),
         )
         write_inline_multiple_line(
             "Max",
-            "Mathf.Max({L}, {VA}.{L})",
+            f"{math}.Max({{L}}, {{VA}}.{{L}})",
             self.gen_format("in {T} {VA}"),
+            self.gen_format("FromVector128(Vector128.Max(AsVector128(this), AsVector128({VA})))"),
         )
         write_inline_multiple_line(
             "Clamp",
-            "Mathf.Clamp({L}, min.{L}, max.{L})",
+            f"{math}.Clamp({{L}}, min.{{L}}, max.{{L}})",
             self.gen_format("in {T} min, in {T} max"),
+            "FromVector128(Vector128.Min(Vector128.Max(AsVector128(this), AsVector128(min)), AsVector128(max)))",
+        )
+        self.write_region_end()
+
+    def write_in_place(self):
+        # Mutators and out overloads working on the fields directly, so tight
+        # loops do not build a temporary per operation. Only the types filling
+        # a whole Vector128 take the accelerated path here, padding the others
+        # would cost the copy these methods avoid.
+        vectorized = self.simd and self.fills_vector128()
+
+        def gen_compound(signal: str, operand: str) -> str:
+            if self.is_promoted():
+                return f"{{L}} = ({{NT}})({{L}} {signal} {operand});"
+            return f"{{L}} {signal}= {operand};"
+
+        def write_statements(header: str, piece: str, target: str = "this", vector: str = None, setup: str = None):
+            self.write_inline_tip()
+            self.write_block(self.gen_format(header))
+            if vectorized and vector is not None:
+                self.write_block(f"if ({SIMD_CHECK})")
+                self.write(f"{target} = FromVector128({self.gen_format(vector)});")
+                self.write("return;")
+                self.write_unident()
+            if setup is not None:
+                self.write(self.gen_format(setup))
+            for i in range(self.vectorSize):
+                self.write(self.gen_format(piece, i))
+            self.write_unident()
+
+        def gen_magnitude(source: str) -> str:
+            # Kept in the magnitude type, promoted components divide by it as an int or long.
+            return f"var magnitude = {source}Magnitude();"
+
+        self.write_region_start("IN_PLACE")
+        write_statements(
+            "public void AddInPlace(in {T} {VA})",
+            gen_compound("+", "{VA}.{L}"),
+            vector="AsVector128(this) + AsVector128({VA})",
+        )
+        write_statements(
+            "public void AddScaledInPlace(in {T} {VA}, {NT} {NA})",
+            gen_compound("+", "{VA}.{L} * {NA}"),
+            vector="AsVector128(this) + AsVector128({VA}) * Vector128.Create({NA})",
+        )
+        write_statements(
+            "public void ScaleInPlace({NT} {NA})",
+            gen_compound("*", "{NA}"),
+            vector="AsVector128(this) * Vector128.Create({NA})",
+        )
+        write_statements(
+            "public void ScaleInPlace(in {T} {VA})",
+            gen_compound("*", "{VA}.{L}"),
+            vector="AsVector128(this) * AsVector128({VA})",
+        )
+        write_statements("public void NormalizeInPlace()", gen_compound("/", "magnitude"), setup=gen_magnitude(""))
+        write_statements(
+            "public void ClampInPlace(in {T} min, in {T} max)",
+            f"{{L}} = {MATH_CLASSES[self.typeId]}.Clamp({{L}}, min.{{L}}, max.{{L}});",
+            vector="Vector128.Min(Vector128.Max(AsVector128(this), AsVector128(min)), AsVector128(max))",
+        )
+        write_statements(
+            "public static void Add(in {T} {VA1}, in {T} {VA2}, out {T} result)",
+            "result.{L} = " + self.gen_cast("{VA1}.{L} + {VA2}.{L}") + ";",
+            "result",
+            "AsVector128({VA1}) + AsVector128({VA2})",
+        )
+        write_statements(
+            "public static void Scale(in {T} {VA}, {NT} {NA}, out {T} result)",
+            "result.{L} = " + self.gen_cast("{VA}.{L} * {NA}") + ";",
+            "result",
+            "AsVector128({VA}) * Vector128.Create({NA})",
+        )
+        write_statements(
+            "public static void Normalize(in {T} {VA}, out {T} result)",
+            "result.{L} = " + self.gen_cast("{VA}.{L} / magnitude") + ";",
+            "result",
+            setup=gen_magnitude("{VA}."),
+        )
+        write_statements(
+            "public static void Clamp(in {T} {VA}, in {T} min, in {T} max, out {T} result)",
+            f"result.{{L}} = {MATH_CLASSES[self.typeId]}.Clamp({{VA}}.{{L}}, min.{{L}}, max.{{L}});",
+            "result",
+            "Vector128.Min(Vector128.Max(AsVector128({VA}), AsVector128(min)), AsVector128(max))",
+        )
+        # a * s + b in one pass, the scalar path is not fused so it rounds
+        # like the operators do.
+        multiplyAdd = self.gen_cast("{VA1}.{L} * {NA} + {VA2}.{L}")
+        write_statements(
+            "public static void MultiplyAdd(in {T} {VA1}, {NT} {NA}, in {T} {VA2}, out {T} result)",
+            f"result.{{L}} = {multiplyAdd};",
+            "result",
+            "AsVector128({VA1}) * Vector128.Create({NA}) + AsVector128({VA2})",
+        )
+        self.write_inline_tip()
+        self.write_func_header(
+            "MultiplyAdd",
+            self.gen_simd(
+                self.gen_format("FromVector128(AsVector128({VA1}) * Vector128.Create({NA}) + AsVector128({VA2}))"),
+                f"new({self.gen_sequence(multiplyAdd)})",
+            )
+            + ";",
+            self.gen_format("in {T} {VA1}, {NT} {NA}, in {T} {VA2}"),
+            self.gen_vector_type(),
+            True,
+            False,
+            False,
         )
         self.write_region_end()
 
@@ -414,10 +949,11 @@ class GenerateNumeric(BaseGenerator):
             implicit: bool = False,
             upperLetter: bool = False,
             castTo: str = None,
+            convertPiece: str = None,
         ):
             seq = COMA.join(
                 self.gen_format(
-                    "{CAST}{VA}.{LETTER}",
+                    "{CAST}{VA}.{LETTER}" if convertPiece is None else convertPiece,
                     CAST="" if castTo is None else f"({castTo})",
                     LETTER=VECTOR_LETTERS[i].upper()
                     if upperLetter
@@ -450,12 +986,43 @@ class GenerateNumeric(BaseGenerator):
                 returnType=self.gen_vector_type(0, 0),
             )
 
+        def write_half_rounders(func, halfFunc):
+            piece = "(int)Half.{FUNC}({L})"
+            self.write_func_header(
+                f"{func}ToInt",
+                f"new({self.gen_sequence(piece, FUNC=halfFunc)});",
+                returnType=self.gen_vector_type(0, 0),
+            )
+
+        def write_compact_converters(castTo: bool):
+            # Widening to int, float and double loses nothing, narrowing back
+            # saturates at the element range instead of wrapping.
+            # Half to int would truncate, that one goes through the rounders.
+            for i in range(1 if castTo else 0, 3):
+                write_converter(
+                    self.gen_vector_type(),
+                    self.gen_vector_type(0, i),
+                    True,
+                    castTo=TYPES[i] if castTo else None,
+                )
+            if castTo:
+                # Half.CreateSaturating overflows to infinity, clamp to the finite range instead.
+                piece = "(Half)Math.Clamp({VA}.{LETTER}, -65504, 65504)"
+            else:
+                piece = f"{self.gen_numeric_type()}.CreateSaturating({{VA}}.{{LETTER}})"
+            for i in range(3):
+                write_converter(self.gen_vector_type(0, i), self.gen_vector_type(), convertPiece=piece)
+
         self.write_region_start("CONVERTERS")
         match (self.typeId):
             case 1 | 2:
                 # float->int, double->int
                 for f in ("Round", "Ceil", "Floor"):
                     write_rounders(f)
+            case 4:
+                # Half->int
+                for f, halfFunc in (("Round", "Round"), ("Ceil", "Ceiling"), ("Floor", "Floor")):
+                    write_half_rounders(f, halfFunc)
         match (self.typeId):
             case 0:
                 write_godot_converters(f"Vector{self.vectorSize}I")
@@ -484,12 +1051,237 @@ class GenerateNumeric(BaseGenerator):
                 write_converter(
                     self.gen_vector_type(0, 0), self.gen_vector_type(), True
                 )
+            case 4:
+                # Half only converts to float and double explicitly.
+                write_compact_converters(True)
+            case 5 | 6 | 7 | 8:
+                write_compact_converters(False)
+        self.write_region_end()
+
+    def write_bulk(self):
+        # Static methods over spans, so bulk work does not pay a call and a
+        # copy per element. Add, Scale, Clamp and the Min/Max reductions run
+        # on the flattened components with System.Numerics.Vector, the rest
+        # loops over the single value methods.
+        size = self.vectorSize
+        vector = f"{NUMERICS_VECTOR}<{self.gen_numeric_type()}>"
+        # System.Numerics.Vector has no Half lanes.
+        vectorizable = self.gen_numeric_type() != "Half"
+        # Lane j of a vector holds component j % size only when the vector
+        # width is a multiple of the size, which never holds for 3.
+        patterned = f"{NUMERICS_VECTOR}.IsHardwareAccelerated && {vector}.Count % {size} == 0"
+        patternable = vectorizable and size != 3
+
+        def write_vector_loop(body: str, condition: str, setup=()):
+            # Leaves i at the first component the vector loop did not handle.
+            self.write("int i = 0;")
+            if not vectorizable:
+                return
+            self.write_block(f"if ({condition})")
+            self.write(f"int width = {vector}.Count;")
+            for line in setup:
+                self.write(line)
+            self.write_block("for (; i <= x.Length - width; i += width)")
+            self.write(body)
+            self.write_unident()
+            self.write_unident()
+
+        def write_map(name: str, args: str, body: str, returnType: str = None):
+            # result[e] = values[e].body for every element.
+            self.write_block(
+                self.gen_format(
+                    "public static void {NAME}(ReadOnlySpan<{T}> values, {ARGS}Span<{RT}> result)",
+                    NAME=name,
+                    ARGS=args,
+                    RT=returnType or self.gen_vector_type(),
+                )
+            )
+            self.write_check("result.Length < values.Length", "Result span is too short")
+            self.write_loop("for (int e = 0; e < values.Length; e++)", f"result[e] = values[e].{body};")
+            self.write_unident()
+
+        def write_pattern(name: str, source: str):
+            # A vector repeating the components of source across its lanes.
+            return (
+                f"for (int lane = 0; lane < width; lane++) pattern[lane] = {source}[lane % {size}];",
+                f"var {name} = new {vector}(pattern);",
+            )
+
+        self.write_region_start("BULK")
+        self.write_block(self.gen_format("public static void Add(ReadOnlySpan<{T}> a, ReadOnlySpan<{T}> b, Span<{T}> result)"))
+        self.write_check("b.Length != a.Length || result.Length < a.Length", "Span lengths do not match")
+        self.write_flatten(("x", "a"), ("y", "b"), ("r", "result"))
+        write_vector_loop(
+            f"(new {vector}(x[i..]) + new {vector}(y[i..])).CopyTo(r[i..]);",
+            f"{NUMERICS_VECTOR}.IsHardwareAccelerated",
+        )
+        self.write_loop("for (; i < x.Length; i++)", self.gen_format("r[i] = " + self.gen_cast("x[i] + y[i]") + ";"))
+        self.write_unident()
+
+        self.write_block(self.gen_format("public static void Scale(ReadOnlySpan<{T}> values, {NT} {NA}, Span<{T}> result)"))
+        self.write_check("result.Length < values.Length", "Result span is too short")
+        self.write_flatten(("x", "values"), ("r", "result"))
+        write_vector_loop(
+            self.gen_format("(new {V}(x[i..]) * {NA}).CopyTo(r[i..]);", V=vector),
+            f"{NUMERICS_VECTOR}.IsHardwareAccelerated",
+        )
+        self.write_loop("for (; i < x.Length; i++)", self.gen_format("r[i] = " + self.gen_cast("x[i] * {NA}") + ";"))
+        self.write_unident()
+
+        write_map("Normalize", "", "Normalized()")
+
+        for name in ("Min", "Max"):
+            self.write_block(self.gen_format("public static {T} {NAME}(ReadOnlySpan<{T}> values)", NAME=name))
+            self.write_check("values.IsEmpty", "Span is empty")
+            self.write(self.gen_format("{T} result = values[0];"))
+            start = "1"
+            if patternable:
+                self.write_flatten(("x", "values"))
+                self.write("int i = 0;")
+                self.write_block(f"if ({patterned} && x.Length >= {vector}.Count)")
+                self.write(f"int width = {vector}.Count;")
+                self.write(f"var accumulator = new {vector}(x);")
+                self.write_loop(
+                    "for (i = width; i <= x.Length - width; i += width)",
+                    f"accumulator = {NUMERICS_VECTOR}.{name}(accumulator, new {vector}(x[i..]));",
+                )
+                self.write_loop(
+                    f"for (int lane = 0; lane < width; lane += {size})",
+                    f"result = result.{name}(new({COMA.join(f'accumulator[lane + {j}]' for j in range(size))}));",
+                )
+                self.write_unident()
+                start = f"Math.Max(i / {size}, 1)"
+            self.write_loop(f"for (int e = {start}; e < values.Length; e++)", f"result = result.{name}(values[e]);")
+            self.write("return result;")
+            self.write_unident()
+
+        self.write_block(
+            self.gen_format("public static void Clamp(ReadOnlySpan<{T}> values, in {T} min, in {T} max, Span<{T}> result)")
+        )
+        self.write_check("result.Length < values.Length", "Result span is too short")
+        start = "0"
+        if patternable:
+            self.write_flatten(("x", "values"), ("r", "result"))
+            write_vector_loop(
+                f"{NUMERICS_VECTOR}.Min({NUMERICS_VECTOR}.Max(new {vector}(x[i..]), low), high).CopyTo(r[i..]);",
+                patterned,
+                (
+                    f"Span<{self.gen_numeric_type()}> pattern = stackalloc {self.gen_numeric_type()}[width];",
+                    *write_pattern("low", "min"),
+                    *write_pattern("high", "max"),
+                ),
+            )
+            start = f"i / {size}"
+        self.write_loop(f"for (int e = {start}; e < values.Length; e++)", "result[e] = values[e].Clamp(min, max);")
+        self.write_unident()
+
+        write_map("Distance", self.gen_format("in {T} point, "), "Distance(point)", self.gen_magnitude_type())
+        if self.typeId in (1, 2, 4):
+            for func in ("Round", "Ceil", "Floor"):
+                write_map(f"{func}ToInt", "", f"{func}ToInt()", self.gen_vector_type(0, 0))
+        self.write_region_end()
+
+    def write_span_converters(self):
+        # Converters for whole spans. Spans of Godot vectors with the same
+        # layout are reinterpreted in place, the others are widened or
+        # narrowed into a span the caller provides, so nothing is allocated.
+        size = self.vectorSize
+        if self.typeId > 2:
+            return
+
+        def write_reinterpret(godotType: str):
+            # No static_assert in C#, the size check folds to a constant in the JIT.
+            check = self.gen_format("Debug.Assert(Unsafe.SizeOf<{T}>() == Unsafe.SizeOf<{G}>());", G=godotType)
+            for name, span, fromType, toType in (
+                ("FromGodot", "ReadOnlySpan", godotType, self.gen_vector_type()),
+                ("ToGodot", "ReadOnlySpan", self.gen_vector_type(), godotType),
+                ("FromGodotWritable", "Span", godotType, self.gen_vector_type()),
+                ("ToGodotWritable", "Span", self.gen_vector_type(), godotType),
+            ):
+                self.write_block(
+                    f"public static {span}<{toType}> {name}({span}<{fromType}> values)"
+                )
+                self.write(check)
+                self.write(f"return MemoryMarshal.Cast<{fromType}, {toType}>(values);")
+                self.write_unident()
+
+        def write_godot_copies(godotType: str):
+            for name, fromType, toType in (
+                ("FromGodot", godotType, self.gen_vector_type()),
+                ("ToGodot", self.gen_vector_type(), godotType),
+            ):
+                self.write_block(f"public static void {name}(ReadOnlySpan<{fromType}> values, Span<{toType}> result)")
+                self.write_check("result.Length < values.Length", "Result span is too short")
+                self.write_loop("for (int e = 0; e < values.Length; e++)", f"result[e] = ({toType})values[e];")
+                self.write_unident()
+
+        def write_convert(fromId: int):
+            # result[e] = (T)values[e] over the flattened components, with a
+            # vector loop where System.Numerics.Vector has the conversion.
+            fromType = TYPES[fromId]
+            toType = self.gen_numeric_type()
+            vector = f"{NUMERICS_VECTOR}<{fromType}>"
+            load = f"new {vector}(x[i..])"
+            body = None
+            match (fromId, self.typeId):
+                case (0, 1):
+                    body = f"{NUMERICS_VECTOR}.ConvertToSingle({load}).CopyTo(r[i..]);"
+                case (1, 0):
+                    body = f"{NUMERICS_VECTOR}.ConvertToInt32({load}).CopyTo(r[i..]);"
+                case (1, 2):
+                    body = (
+                        f"{NUMERICS_VECTOR}.Widen({load}, out var low, out var high); "
+                        "low.CopyTo(r[i..]); high.CopyTo(r[(i + width / 2)..]);"
+                    )
+                case (2, 1):
+                    # Two vectors of doubles narrow into one of floats.
+                    vector = f"{NUMERICS_VECTOR}<{toType}>"
+                    body = (
+                        f"{NUMERICS_VECTOR}.Narrow(new {NUMERICS_VECTOR}<{fromType}>(x[i..]), "
+                        f"new {NUMERICS_VECTOR}<{fromType}>(x[(i + width / 2)..])).CopyTo(r[i..]);"
+                    )
+            self.write_block(
+                self.gen_format(
+                    "public static void Convert(ReadOnlySpan<{FROM}> values, Span<{T}> result)",
+                    FROM=self.gen_vector_type(0, fromId),
+                )
+            )
+            self.write_check("result.Length < values.Length", "Result span is too short")
+            self.write_flatten(("x", "values"), typeId=fromId)
+            self.write_flatten(("r", "result"))
+            self.write("int i = 0;")
+            if body is not None:
+                self.write_block(f"if ({NUMERICS_VECTOR}.IsHardwareAccelerated)")
+                self.write(f"int width = {vector}.Count;")
+                self.write_loop("for (; i <= x.Length - width; i += width)", body)
+                self.write_unident()
+            self.write_loop("for (; i < x.Length; i++)", f"r[i] = ({toType})x[i];")
+            self.write_unident()
+
+        self.write_region_start("SPAN_CONVERTERS")
+        match (self.typeId):
+            case 0:
+                write_reinterpret(f"Vector{size}I")
+                for fromId in (1, 2):
+                    write_convert(fromId)
+            case 1:
+                # Godot vectors are float unless built with double precision.
+                self.write("#if GODOT_REAL_T_IS_DOUBLE")
+                write_godot_copies(f"Vector{size}")
+                self.write("#else")
+                write_reinterpret(f"Vector{size}")
+                self.write("#endif")
+                for fromId in (2, 0):
+                    write_convert(fromId)
+            case 2:
+                for fromId in (1, 0):
+                    write_convert(fromId)
         self.write_region_end()
 
 
 class GenerateBoolean(BaseGenerator):
-    def __init__(self, vectorSize: int):
-        super().__init__(3, vectorSize)
+    def __init__(self, vectorSize: int, stream: TextIO = None, **options):
+        super().__init__(3, vectorSize, stream, **options)
 
     def generate(self):
         self.write(NEWLINE.join(USING), 2)
@@ -557,23 +1349,1083 @@ class GenerateBoolean(BaseGenerator):
         self.write_region_end()
 
 
-def write_file(gen: BaseGenerator):
-    file_name = FOLDER / f"{gen.gen_vector_type()}.cs"
-    with open(file_name, "w") as file:
-        file.write(gen.result)
-    print(f"{file_name} writen")
+class GeneratePackedBoolean(BaseGenerator):
+    # A boolean vector packed into the low bits of one byte, bit i holding
+    # component i. Everything else works on the whole mask at once.
+    def __init__(self, vectorSize: int, stream: TextIO = None, **options):
+        super().__init__(9, vectorSize, stream, **options)
+
+    def gen_mask(self) -> str:
+        return f"0b{'1' * self.vectorSize}"
+
+    def generate(self):
+        self.write(NEWLINE.join(USING), 2)
+        self.write(NAMESPACE, 2)
+        self.write(self.gen_format("public struct {T} : IEquatable<{T}>"))
+        self.write_ident()
+        self.write_properties()
+        self.write_constructors()
+        self.write_logical_operators()
+        self.write_object_operators()
+        self.write_converters()
+        self.write_unident()
+
+    def write_properties(self):
+        def write_function(name, returnType, body):
+            self.write(f"public readonly {returnType} {name} => {body};")
+
+        self.write_region_start("PROPERTIES")
+        self.write(f"private const int Mask = {self.gen_mask()};")
+        self.write("public byte bits;")
+        for i in range(self.vectorSize):
+            self.write(
+                self.gen_format(
+                    "public {NT} {L} {{ readonly get => (bits & {BIT}) != 0; "
+                    "set => bits = (byte)(value ? bits | {BIT} : bits & ~{BIT}); }}",
+                    i,
+                    BIT=1 << i,
+                )
+            )
+        write_function("AllTrue", "bool", "(bits & Mask) == Mask")
+        write_function("AllEqual", "bool", "(bits & Mask) == 0 || (bits & Mask) == Mask")
+        write_function("AnyTrue", "bool", "(bits & Mask) != 0")
+        write_function("TrueCount", "int", "System.Numerics.BitOperations.PopCount((uint)(bits & Mask))")
+        self.write_region_end()
+
+    def write_constructors(self):
+        self.write_region_start("CONSTRUCTORS")
+        self.write(self.gen_format("public {T}({NT} n) {{ bits = (byte)(n ? Mask : 0); }}"))
+        self.write(
+            self.gen_format(
+                "public {T}({SEQ1}) {{ bits = (byte)({SEQ2}); }}",
+                SEQ1=self.gen_sequence("{NT} {L} = false"),
+                SEQ2=COMA.join(f"({VECTOR_LETTERS[i]} ? {1 << i} : 0)" for i in range(self.vectorSize)).replace(
+                    COMA, " | "
+                ),
+            )
+        )
+        self.write_region_end()
+
+    def write_logical_operators(self):
+        self.write_region_start("LOGICAL_OPERATORS")
+        for signal in ("==", "!="):
+            self.write_inline_tip()
+            self.write_func_header(
+                f"operator {signal}",
+                self.gen_format("({VA1}.bits & Mask) {S} ({VA2}.bits & Mask);", S=signal),
+                self.gen_format("in {T} {VA1}, in {T} {VA2}"),
+                self.gen_numeric_type(),
+                True,
+                False,
+                False,
+            )
+        # Component wise and, or and xor in one instruction each.
+        for signal in ("&", "|", "^"):
+            self.write_inline_tip()
+            self.write_func_header(
+                f"operator {signal}",
+                self.gen_format("new() {{ bits = (byte)({VA1}.bits {S} {VA2}.bits) }};", S=signal),
+                self.gen_format("in {T} {VA1}, in {T} {VA2}"),
+                self.gen_vector_type(),
+                True,
+                False,
+                False,
+            )
+        self.write_inline_tip()
+        self.write_func_header(
+            "operator !",
+            self.gen_format("new() {{ bits = (byte)(~{VA}.bits & Mask) }};"),
+            self.gen_format("in {T} {VA}"),
+            self.gen_vector_type(),
+            True,
+            False,
+            False,
+        )
+        self.write_region_end()
+
+    def write_object_operators(self):
+        self.write_region_start("OBJECT_OPERATORS")
+        self.write_inline_tip()
+        self.write_func_header(
+            "Equals",
+            self.gen_format("obj is {T} {VA} && Equals({VA});"),
+            "object obj",
+            "bool",
+            False,
+            True,
+            True,
+        )
+        self.write_inline_tip()
+        self.write_func_header(
+            "Equals",
+            self.gen_format("(bits & Mask) == ({VA}.bits & Mask);"),
+            self.gen_format("{T} {VA}"),
+            "bool",
+            False,
+            False,
+            True,
+        )
+        self.write_inline_tip()
+        self.write_func_header("GetHashCode", "bits & Mask;", "", "int", False, True, True)
+        self.write_func_header(
+            "ToString",
+            f'$"{self.gen_vector_type()}({self.gen_sequence("{{{L}}}")})";',
+            "",
+            "string",
+            False,
+            True,
+            True,
+        )
+        self.write_key_comparer()
+        self.write_region_end()
+
+    def write_converters(self):
+        # Lossless both ways, so both are implicit.
+        unpacked = self.gen_vector_type(0, 3)
+        self.write_region_start("CONVERTERS")
+        self.write_func_header(
+            f"operator {unpacked}",
+            f"new({self.gen_sequence('{VA}.{L}')});",
+            self.gen_format("in {T} {VA}"),
+            "implicit",
+            True,
+            False,
+            False,
+        )
+        self.write_func_header(
+            f"operator {self.gen_vector_type()}",
+            f"new({self.gen_sequence('{VA}.{L}')});",
+            f"in {unpacked} {SINGLE_VECTOR_ARG}",
+            "implicit",
+            True,
+            False,
+            False,
+        )
+        self.write_region_end()
+
+
+def read_types(text: str) -> list:
+    # Splits C# source with a file scoped namespace into its top level types,
+    # as (declaration lines, members). A member is (head, lines), the head being
+    # its public declaration line or None for region lines, and its lines
+    # include the attributes and comments above it.
+    types = []
+    header = []
+    members = None
+    pending = []
+    for line in text.splitlines():
+        if members is None:
+            if line == "{":
+                members = []
+            elif line.startswith(("[", "public")):
+                header.append(line)
+            continue
+        if line == "}":
+            types.append((header, members))
+            header = []
+            members = None
+            continue
+        stripped = line.strip()
+        top = len(line) > len(IDENTATION) and line.startswith(IDENTATION) and line[len(IDENTATION)] != " "
+        if top and stripped.startswith("public"):
+            members.append((stripped, pending + [line]))
+            pending = []
+        elif top and stripped.startswith(("[", "//")):
+            pending.append(line)
+        elif top and stripped.startswith("#"):
+            members.append((None, pending + [line]))
+            pending = []
+        elif members:
+            members[-1][1].append(line)
+    return types
+
+
+def read_usings(text: str) -> list:
+    return [line for line in text.splitlines() if line.startswith("using ")]
+
+
+def split_parameters(parameters: str) -> list:
+    # Splits on the commas outside of type arguments.
+    pieces = [""]
+    depth = 0
+    for char in parameters:
+        depth += char == "<"
+        depth -= char == ">"
+        if char == "," and depth == 0:
+            pieces.append("")
+        else:
+            pieces[-1] += char
+    return [piece.strip() for piece in pieces if piece.strip()]
+
+
+def api_key(head: str) -> str:
+    # A declaration line without its parameter names, default values,
+    # constraints and body, what two members with the same API share.
+    head = head.split("=>")[0].split(" where ")[0].strip().rstrip("{;").strip()
+    head = re.sub(r"^([^(\[]*?) = .*", r"\1", head)
+    match = re.match(r"^(.*?)([(\[])(.*)([)\]])$", head)
+    if match is None:
+        return head
+    prefix, opening, parameters, closing = match.groups()
+    types = [piece.split(" = ")[0].rsplit(" ", 1)[0] for piece in split_parameters(parameters)]
+    return f"{prefix}{opening}{COMA.join(types)}{closing}"
+
+
+class GenerateSpecialization(BaseGenerator):
+    # Rewrites the generic Vec2/3/4<N> and their extensions for one element
+    # type, member by member, so the concrete structs keep the same API.
+    def __init__(self, typeId: int, vectorSize: int, stream: TextIO = None, source: Path = GENERIC_FOLDER):
+        super().__init__(typeId, vectorSize, stream)
+        self.source = source
+
+    def gen_vector_type(self, size: int = 0, typeId: int = None):
+        if size == 0:
+            size = self.vectorSize
+        if typeId is None:
+            typeId = self.typeId
+        return f"Vec{size}{CAP_TYPES[typeId]}"
+
+    def read_source(self, suffix: str = ""):
+        text = (self.source / f"Vec{self.vectorSize}{suffix}.cs").read_text(encoding="utf-8-sig")
+        return read_usings(text), read_types(text)[0]
+
+    def gen_struct_line(self, line: str) -> str:
+        line = re.sub(r"\s*where N : INumber<N>", "", line)
+        line = re.sub(r"\bVec([234])<N>", rf"Vec\g<1>{CAP_TYPES[self.typeId]}", line)
+        line = re.sub(rf"\bpublic Vec{self.vectorSize}\(", f"public {self.gen_vector_type()}(", line)
+        line = re.sub(r"\bpublic struct Vec\d<N>", f"public struct {self.gen_vector_type()}", line)
+        return re.sub(r"\bN\b", self.gen_numeric_type(), line)
+
+    def gen_literal(self, value: str) -> str:
+        number = float(value.rstrip("fFdD"))
+        match self.gen_numeric_type():
+            case "int":
+                return str(int(number))
+            case "float":
+                return f"{number:g}f"
+        text = f"{number:g}"
+        return text if "." in text or "e" in text else text + ".0"
+
+    def gen_struct_member(self, lines: list) -> list:
+        lines = [self.gen_struct_line(line) for line in lines]
+        # Constants built through the generic CreateFrom are plain literals here.
+        return [
+            re.sub(
+                r"(static readonly \w+ \w+ = )CreateFrom\((.*)\);",
+                lambda m: f"{m[1]}new({COMA.join(self.gen_literal(v) for v in split_parameters(m[2]))});",
+                line,
+            )
+            for line in lines
+        ]
+
+    def gen_extension_member(self, head: str, lines: list):
+        # Returns None when the extension does not apply to this element type,
+        # either constrained to the other kind of number or not on a vector.
+        receiver = re.search(r"\bthis Vec(\d)<(\w+)>", head)
+        if receiver is None:
+            return None
+        element = receiver[2]
+        generic = re.search(r"\w+<([^<>()]*)>\(", head)
+        arguments = split_parameters(generic[1]) if generic else []
+        numeric = self.gen_numeric_type()
+        vector = rf"\bVec([234])<{element}>"
+        if element not in arguments:
+            if element != numeric:
+                return None
+            return [re.sub(vector, rf"Vec\g<1>{CAP_TYPES[self.typeId]}", line) for line in lines]
+        constraint = re.search(rf"where {element} : (.*?)(?= where | =>|$)", head)
+        constraint = constraint[1] if constraint else ""
+        if "IFloatingPoint" in constraint and numeric == "int":
+            return None
+        if "IBinaryInteger" in constraint and numeric != "int":
+            return None
+        arguments.remove(element)
+        rewritten = []
+        for line in lines:
+            if line.strip() == head:
+                line = re.sub(rf" where {element} : .*?(?= where | =>|$)", "", line)
+                line = re.sub(
+                    rf"(\w+)<{re.escape(generic[1])}>\(",
+                    lambda m: f"{m[1]}<{COMA.join(arguments)}>(" if arguments else f"{m[1]}(",
+                    line,
+                )
+            line = re.sub(vector, rf"Vec\g<1>{CAP_TYPES[self.typeId]}", line)
+            rewritten.append(re.sub(rf"\b{element}\b", numeric, line))
+        return rewritten
+
+    def gen_members(self, members: list, extension: bool):
+        # Yields (head, lines) of the specialized members, regions included.
+        for head, lines in members:
+            if head is None:
+                yield None, lines
+                continue
+            lines = self.gen_extension_member(head, lines) if extension else self.gen_struct_member(lines)
+            if lines is not None:
+                yield next(line.strip() for line in lines if line.strip().startswith("public")), lines
+
+    def specialized_members(self) -> list:
+        # Every public member the generated file has to declare.
+        _, (_, structMembers) = self.read_source()
+        _, (_, extensionMembers) = self.read_source("Extensions")
+        members = itertools.chain(self.gen_members(structMembers, False), self.gen_members(extensionMembers, True))
+        return [head for head, _ in members if head is not None]
+
+    def generate(self):
+        structUsings, (structHeader, structMembers) = self.read_source()
+        extensionUsings, (extensionHeader, extensionMembers) = self.read_source("Extensions")
+        self.write(NEWLINE.join(dict.fromkeys(structUsings + extensionUsings)), 2)
+        self.write(NAMESPACE, 2)
+        for line in structHeader:
+            self.write(self.gen_struct_line(line))
+        self.write("{")
+        for _, lines in self.gen_members(structMembers, False):
+            for line in lines:
+                self.write(line)
+        self.ident(1)
+        self.write_generic_converters()
+        self.write_unident()
+        self.write("")
+        for line in extensionHeader:
+            self.write(re.sub(r"\bVec(\d)Extensions\b", f"{self.gen_vector_type()}Extensions", line))
+        self.write("{")
+        for _, lines in self.gen_members(extensionMembers, True):
+            for line in lines:
+                self.write(line)
+        self.write("}")
+
+    def write_generic_converters(self):
+        # Same fields in the same order, so both ways are a reinterpretation.
+        generic = f"Vec{self.vectorSize}<{self.gen_numeric_type()}>"
+        specialized = self.gen_vector_type()
+        self.write_region_start("GENERIC_CONVERTERS")
+        for fromType, toType in ((specialized, generic), (generic, specialized)):
+            self.write_inline_tip()
+            self.write(f"public static implicit operator {toType}({fromType} v) => Unsafe.As<{fromType}, {toType}>(ref v);")
+        for fromType, toType in ((generic, specialized), (specialized, generic)):
+            self.write_inline_tip()
+            self.write(
+                f"public static Span<{toType}> Cast(Span<{fromType}> span) => MemoryMarshal.Cast<{fromType}, {toType}>(span);"
+            )
+        self.write_region_end()
+
+
+class Profiler:
+    # Opt-in instrumentation. It patches the section methods and the emitter of
+    # the generators it is attached to, unattached generators run untouched.
+    def __init__(self):
+        self.records = []
+        self.writes = 0
+        self.lines = 0
+        self.bytes = 0
+
+    def counters(self):
+        return time.perf_counter(), self.writes, self.lines, self.bytes
+
+    def attach(self, gen: BaseGenerator):
+        write = gen.emitter.write
+
+        def counted_write(level: int, line: str, newlines: int = 1):
+            self.writes += 1
+            self.lines += line.count(NEWLINE) + newlines
+            self.bytes += len(IDENTATION) * level + len(line.encode()) + len(NEWLINE) * newlines
+            write(level, line, newlines)
+
+        gen.emitter.write = counted_write
+        for name in SECTIONS:
+            method = getattr(gen, name, None)
+            if method is not None:
+                setattr(gen, name, self.measured(gen, name.removeprefix("write_"), method))
+        generate = gen.generate
+
+        def measured_generate():
+            # Adds an "other" record for everything emitted outside the
+            # sections: usings, namespace, braces.
+            first = len(self.records)
+            before = self.counters()
+            generate()
+            after = list(self.counters())
+            for record in self.records[first:]:
+                after[0] -= record["ms"] / 1000
+                after[1] -= record["writes"]
+                after[2] -= record["lines"]
+                after[3] -= record["bytes"]
+            self.record(gen, "other", before, after)
+
+        gen.generate = measured_generate
+
+    def measured(self, gen: BaseGenerator, section: str, method):
+        def wrapper(*args, **kwargs):
+            before = self.counters()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(gen, section, before, self.counters())
+
+        return wrapper
+
+    def record(self, gen: BaseGenerator, section: str, before, after):
+        self.records.append(
+            {
+                "type": CAP_TYPES[gen.typeId],
+                "size": gen.vectorSize,
+                "section": section,
+                "ms": (after[0] - before[0]) * 1000,
+                "writes": after[1] - before[1],
+                "lines": after[2] - before[2],
+                "bytes": after[3] - before[3],
+            }
+        )
+
+
+def print_profile(records: list):
+    print(f"{'Type':<11}{'Size':>5}  {'Section':<20}{'ms':>9}{'writes':>9}{'lines':>9}{'bytes':>10}")
+    totals = {}
+    for record in records:
+        print(
+            f"{record['type']:<11}{record['size']:>5}  {record['section']:<20}{record['ms']:>9.3f}"
+            f"{record['writes']:>9}{record['lines']:>9}{record['bytes']:>10}"
+        )
+        total = totals.setdefault(record["section"], [0.0, 0, 0, 0])
+        for n, key in enumerate(("ms", "writes", "lines", "bytes")):
+            total[n] += record[key]
+    for section, (ms, writes, lines, size) in sorted(totals.items(), key=lambda item: -item[1][3]):
+        print(f"{'all':<11}{'':>5}  {section:<20}{ms:>9.3f}{writes:>9}{lines:>9}{size:>10}")
+
+
+def write_atomic(file_name: Path, write):
+    # Writes through a temp file in the same folder and renames it over the
+    # target, so readers never see a partially written file.
+    # No newline translation, the bytes on disk are exactly the UTF-8 of the
+    # text, LF like .gitattributes wants, and hash like content_hash does.
+    temp = file_name.with_name(f".{file_name.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp, "w", encoding="utf-8", newline="") as file:
+            write(file)
+        os.replace(temp, file_name)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+
+class HashingWriter:
+    # Passes text on to a file while hashing the UTF-8 bytes written.
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.digest = hashlib.sha256()
+
+    def write(self, text: str):
+        self.file.write(text)
+        self.digest.update(text.encode("utf-8"))
+
+
+def write_file(gen: BaseGenerator, folder: Path = FOLDER) -> str:
+    # Generates straight into the file, the whole text is never held in
+    # memory. Returns the content_hash of what was written.
+    writer = None
+
+    def stream(file: TextIO):
+        nonlocal writer
+        writer = HashingWriter(file)
+        gen.emitter.stream = writer
+        gen.generate()
+        gen.emitter.flush()
+
+    write_atomic(folder / f"{gen.gen_vector_type()}.cs", stream)
+    return writer.digest.hexdigest()
+
+
+def units():
+    # (typeId, vectorSize) of every generated file, typeId 3 being the
+    # booleans and 9 the packed booleans.
+    return [(typeId, i) for i in range(2, 3 + 2) for typeId in range(len(TYPES))]
+
+
+def make_generator(typeId: int, vectorSize: int, options: dict = None) -> BaseGenerator:
+    # options are the generator keyword arguments, e.g. simd.
+    if typeId == 3:
+        return GenerateBoolean(vectorSize, **(options or {}))
+    if typeId == 9:
+        return GeneratePackedBoolean(vectorSize, **(options or {}))
+    return GenerateNumeric(typeId, vectorSize, **(options or {}))
+
+
+def source_hash(options: dict = None) -> str:
+    # Hash of the generator source and the options it runs with, different
+    # options generate different files.
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    digest.update(json.dumps(options or {}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def content_hash(text: str) -> str:
+    # Hash of the bytes write_atomic writes for text, the same disk_hash
+    # reads back, so both build paths store the same kind of hash.
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_state(file_name: Path):
+    stat = file_name.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_manifest(folder: Path) -> dict:
+    try:
+        with open(folder / MANIFEST) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(folder: Path, manifest: dict):
+    with open(folder / MANIFEST, "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+        file.write(NEWLINE)
+
+
+def is_up_to_date(folder: Path, manifest: dict, generator: str, names) -> bool:
+    # Same generator source and every output untouched since it was written,
+    # so nothing needs to be generated at all.
+    files = manifest.get("files", {})
+    if manifest.get("generator") != generator or set(files) != set(names):
+        return False
+    for name, entry in files.items():
+        try:
+            state = file_state(folder / name)
+        except OSError:
+            return False
+        if state["size"] != entry["size"] or state["mtime_ns"] != entry["mtime_ns"]:
+            return False
+    return True
+
+
+def disk_hash(file_name: Path):
+    try:
+        return hashlib.sha256(file_name.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def render_unit(unit, folder: Path, force: bool, profile: bool = False, options: dict = None):
+    # Renders one file and writes it when its content changed, returns the
+    # manifest entry, whether it was written and the profiler records, if any.
+    # Runs in the worker processes.
+    gen = make_generator(*unit, options)
+    file_name = folder / f"{gen.gen_vector_type()}.cs"
+    profiler = Profiler() if profile else None
+    if profiler is not None:
+        profiler.attach(gen)
+    if force:
+        text_hash = write_file(gen, folder)
+        written = True
+    else:
+        gen.generate()
+        text = gen.result
+        text_hash = content_hash(text)
+        # Only rewrite files whose content differs, so their mtime stays put.
+        written = disk_hash(file_name) != text_hash
+        if written:
+            write_atomic(file_name, lambda file: file.write(text))
+    records = None if profiler is None else profiler.records
+    return file_name.name, {"sha256": text_hash, **file_state(file_name)}, written, records
+
+
+def build(
+    folder: Path = FOLDER, force: bool = False, jobs: int = 1, profile: bool = False, options: dict = None
+) -> list:
+    # Returns the profiler records when profile is set, every unit is rendered then.
+    generator = source_hash(options)
+    manifest = load_manifest(folder)
+    todo = units()
+    names = [f"{make_generator(*unit).gen_vector_type()}.cs" for unit in todo]
+    if not force and not profile and is_up_to_date(folder, manifest, generator, names):
+        print(f"0 generated, {len(names)} unchanged, 0 removed")
+        return []
+
+    count = len(todo)
+    if jobs > 1:
+        with ProcessPoolExecutor(min(jobs, count)) as pool:
+            results = list(
+                pool.map(render_unit, todo, [folder] * count, [force] * count, [profile] * count, [options] * count)
+            )
+    else:
+        results = [render_unit(unit, folder, force, profile, options) for unit in todo]
+
+    files = {}
+    profiled = []
+    generated = unchanged = removed = 0
+    for name, entry, written, records in results:
+        files[name] = entry
+        profiled.extend(records or ())
+        if written:
+            print(f"{folder / name} writen")
+            generated += 1
+        else:
+            unchanged += 1
+
+    # Outputs of a previous run that are no longer generated.
+    for name in sorted(set(manifest.get("files", {})) - set(files)):
+        try:
+            os.remove(folder / name)
+            print(f"{folder / name} removed")
+            removed += 1
+        except FileNotFoundError:
+            pass
+
+    save_manifest(folder, {"generator": generator, "files": files})
+    print(f"{generated} generated, {unchanged} unchanged, {removed} removed")
+    return profiled
+
+
+def golden_folder(options: dict = None) -> Path:
+    # Golden/default, Golden/simd, Golden/simd-swizzles-none...
+    changed = [
+        name if value is True else f"{name}-{value}"
+        for name, value in sorted((options or {}).items())
+        if value != DEFAULT_OPTIONS.get(name)
+    ]
+    return GOLDEN_FOLDER / ("-".join(changed) or "default")
+
+
+def update_golden(options: dict = None):
+    folder = golden_folder(options)
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder.parent / ".gdignore").touch()
+    names = set()
+    for unit in units():
+        gen = make_generator(*unit, options)
+        gen.generate()
+        name = f"{gen.gen_vector_type()}.cs{GOLDEN_SUFFIX}"
+        names.add(name)
+        write_atomic(folder / name, lambda file: file.write(gen.result))
+    for stale in folder.glob(f"*{GOLDEN_SUFFIX}"):
+        if stale.name not in names:
+            stale.unlink()
+    print(f"{len(names)} golden files written to {folder}")
+
+
+def verify(folder: Path = None, options: dict = None) -> int:
+    # Compares freshly rendered files against the ones in folder, by default
+    # the committed golden files of these options. Returns the number of
+    # mismatches, a missing or extra file counts as one.
+    suffix = ""
+    if folder is None:
+        folder, suffix = golden_folder(options), GOLDEN_SUFFIX
+    mismatches = 0
+    names = set()
+    for unit in units():
+        gen = make_generator(*unit, options)
+        gen.generate()
+        name = f"{gen.gen_vector_type()}.cs{suffix}"
+        names.add(name)
+        try:
+            expected = (folder / name).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            print(f"{folder / name} missing")
+            mismatches += 1
+            continue
+        if expected != gen.result:
+            diff = difflib.unified_diff(
+                expected.splitlines(), gen.result.splitlines(), str(folder / name), "generated", lineterm=""
+            )
+            print(NEWLINE.join(diff))
+            mismatches += 1
+    if suffix:
+        for extra in sorted(folder.glob(f"*{suffix}")):
+            if extra.name not in names:
+                print(f"{extra} is no longer generated")
+                mismatches += 1
+    print(f"{mismatches} of {len(units())} files differ from {folder}")
+    return mismatches
+
+
+def specializations(source: Path = GENERIC_FOLDER) -> list:
+    return [
+        GenerateSpecialization(typeId, vectorSize, source=source)
+        for vectorSize in range(2, 3 + 2)
+        for typeId in SPECIALIZED_TYPES
+    ]
+
+
+def specialize(folder: Path = FOLDER, source: Path = GENERIC_FOLDER):
+    # Rewrites only the specializations whose content changed.
+    generated = unchanged = 0
+    for gen in specializations(source):
+        gen.generate()
+        text = gen.result
+        file_name = folder / f"{gen.gen_vector_type()}.cs"
+        if disk_hash(file_name) == content_hash(text):
+            unchanged += 1
+            continue
+        write_atomic(file_name, lambda file: file.write(text))
+        print(f"{file_name} writen")
+        generated += 1
+    print(f"{generated} generated, {unchanged} unchanged")
+
+
+def check_parity(folder: Path = FOLDER, source: Path = GENERIC_FOLDER) -> int:
+    # Compares the public API the generic sources have now against the
+    # specializations in folder. Returns the number of missing members.
+    missing = 0
+    for gen in specializations(source):
+        file_name = folder / f"{gen.gen_vector_type()}.cs"
+        try:
+            text = file_name.read_text(encoding="utf-8-sig")
+        except FileNotFoundError:
+            print(f"{file_name} missing")
+            missing += 1
+            continue
+        declared = {api_key(head) for _, members in read_types(text) for head, _ in members if head is not None}
+        for head in gen.specialized_members():
+            if api_key(head) not in declared:
+                print(f"{file_name.name} lacks {api_key(head)}")
+                missing += 1
+    print(f"{missing} members missing from the specializations")
+    return missing
+
+
+class CsInteger:
+    # An integer with the C# arithmetic rules, for evaluating generated
+    # expressions: narrower types promote to int and results wrap.
+    def __init__(self, value: int, typeName: str):
+        bits, signed = CS_INTEGERS[typeName]
+        value &= (1 << bits) - 1
+        if signed and value >= 1 << (bits - 1):
+            value -= 1 << bits
+        self.value = value
+        self.typeName = typeName
+
+    def binary(self, other, operation):
+        if not isinstance(other, CsInteger):
+            other = CsInteger(other, "int")
+        typeName = "long" if "long" in (self.typeName, other.typeName) else "int"
+        return CsInteger(operation(self.value, other.value), typeName)
+
+    def __add__(self, other):
+        return self.binary(other, lambda a, b: a + b)
+
+    def __sub__(self, other):
+        return self.binary(other, lambda a, b: a - b)
+
+    def __mul__(self, other):
+        return self.binary(other, lambda a, b: a * b)
+
+
+def evaluate_expression(expression: str, components: dict, other: dict) -> int:
+    # Evaluates a generated integer expression over x, y, z, w and other.x,
+    # other.y... Casts become calls, (long)(a) keeps its parentheses.
+    expression = re.sub(r"\((long|int)\)\(", r"\1_(", expression)
+    expression = re.sub(r"\((long|int)\)([\w.]+)", r"\1_(\2)", expression)
+    names = {
+        "long_": lambda v: CsInteger(v.value, "long"),
+        "int_": lambda v: CsInteger(v.value, "int"),
+        "other": type("Other", (), other),
+        **components,
+    }
+    return eval(expression, {"__builtins__": {}}, names).value
+
+
+def gen_expression(text: str, declaration: str) -> str:
+    # The expression body of the generated member declared as declaration.
+    for line in text.splitlines():
+        if declaration in line:
+            return line.split("=> ", 1)[1].rstrip(";")
+    raise LookupError(declaration)
+
+
+def cs_cast(expression: str, typeName: str) -> str:
+    # A Python expression converting expression to a C# integer type.
+    bits, signed = CS_INTEGERS[typeName]
+    if signed:
+        return f"((({expression}) + {1 << (bits - 1)} & {(1 << bits) - 1:#x}) - {1 << (bits - 1)})"
+    return f"(({expression}) & {(1 << bits) - 1:#x})"
+
+
+def translate_casts(expression: str) -> str:
+    # Rewrites the integer casts of a generated expression, innermost first.
+    # The operand of a cast is a name, a call or a parenthesized expression.
+    cast = re.compile(rf"\(({'|'.join(CS_INTEGERS)})\)")
+    matches = list(cast.finditer(expression))
+    while matches:
+        match = matches[-1]
+        start = end = match.end()
+        while end < len(expression) and (expression[end].isalnum() or expression[end] == "_"):
+            end += 1
+        if end < len(expression) and expression[end] == "(":
+            depth = 0
+            for end in range(end, len(expression)):
+                depth += {"(": 1, ")": -1}.get(expression[end], 0)
+                if depth == 0:
+                    break
+            end += 1
+        expression = expression[: match.start()] + cs_cast(expression[start:end], match[1]) + expression[end:]
+        matches = list(cast.finditer(expression))
+    return expression
+
+
+def compile_hash(text: str, components: int):
+    # The GetHashCode of a generated integer vector, together with the Mix it
+    # calls, translated from the C# text into a Python function of the
+    # components that returns the hash as an unsigned 32 bit value.
+    lines = [line.strip() for line in text.splitlines()]
+    start = lines.index("private static ulong Mix(ulong h)") + 2
+    body = [cs_cast("h", "ulong")]
+    for line in lines[start : lines.index("}", start)]:
+        line = re.sub(r"\b(0x[0-9A-F]+|\d+)UL\b", r"\1", line.rstrip(";"))
+        if line.startswith("return "):
+            body.append(cs_cast(line[len("return ") :], "ulong"))
+        else:
+            name, operation, value = line.split(" ", 2)
+            body.append(cs_cast(f"{name} {operation[:-1]} ({value})", "ulong"))
+    mix = "def Mix(h):\n" + "".join(f"    h = {step}\n" for step in body[:-1]) + f"    return {body[-1]}\n"
+    names = {}
+    exec(mix, {}, names)
+    expression = translate_casts(gen_expression(text, "int GetHashCode()"))
+    letters = ", ".join(VECTOR_LETTERS[:components])
+    return eval(f"lambda {letters}: ({expression}) & 0xFFFFFFFF", {"__builtins__": {}, **names})
+
+
+def hash_patterns(numeric: str, vectorSize: int, keys: int) -> dict:
+    # Coordinates --hash-check hashes, by pattern name: a cube around zero,
+    # cubes at the ends of the range and power of two strided grids, each
+    # of about keys vectors.
+    bits = INTEGER_BITS[numeric]
+    low = 0 if numeric in UNSIGNED_TYPES else -(1 << (bits - 1))
+    high = low + (1 << bits) - 1
+    side = min(round(keys ** (1 / vectorSize)), 1 << bits)
+    origin = 0 if numeric in UNSIGNED_TYPES else -(side // 2)
+    patterns = {"origin": range(origin, origin + side)}
+    if side < 1 << bits:
+        patterns["high"] = range(high - side + 1, high + 1)
+        if low < 0:
+            patterns["low"] = range(low, low + side)
+    for stride in HASH_CHECK_STRIDES:
+        if side * stride <= 1 << bits:
+            first = 0 if numeric in UNSIGNED_TYPES else -(side // 2) * stride
+            patterns[f"stride{stride}"] = range(first, first + side * stride, stride)
+    return {name: itertools.product(axis, repeat=vectorSize) for name, axis in patterns.items()}
+
+
+def arithmetic_check() -> int:
+    # Runs the generated SqrMagnitude and SqrDistance of the compact integer
+    # vectors through C# arithmetic on ARITHMETIC_CASES, where a subtraction
+    # or square in a too narrow type wraps. Returns the number of wrong results.
+    failures = 0
+    for numeric, a, b in ARITHMETIC_CASES:
+        gen = GenerateNumeric(TYPES.index(numeric), len(a))
+        gen.generate()
+        magnitudeType = gen.gen_magnitude_type()
+        components = {VECTOR_LETTERS[i]: CsInteger(v, numeric) for i, v in enumerate(a)}
+        other = {VECTOR_LETTERS[i]: CsInteger(v, numeric) for i, v in enumerate(b)}
+        results = (
+            ("SqrMagnitude", f"{magnitudeType} SqrMagnitude()", sum(v * v for v in a)),
+            ("SqrDistance", f"{magnitudeType} SqrDistance(", sum((u - v) ** 2 for u, v in zip(a, b))),
+        )
+        for name, declaration, expected in results:
+            try:
+                value = evaluate_expression(gen_expression(gen.result, declaration), components, other)
+            except (NameError, TypeError, AttributeError):
+                # e.g. (other - this).SqrMagnitude(), which subtracts in the element type.
+                value = "not per component"
+            failed = value != expected
+            failures += failed
+            print(
+                f"{gen.gen_vector_type()}{a}.{name}({b if name == 'SqrDistance' else ''}) = {value}"
+                f"{f'  FAILED, expected {expected}' if failed else ''}"
+            )
+    print(f"{failures} wrong results")
+    return failures
+
+
+def next_prime(n: int) -> int:
+    while any(n % d == 0 for d in range(2, int(n**0.5) + 1)):
+        n += 1
+    return n
+
+
+def hash_check(keys: int = HASH_CHECK_KEYS) -> int:
+    # Runs the generated GetHashCode of every integer vector over each of its
+    # hash_patterns, then compares the collisions and the empty buckets of a
+    # Dictionary that size, prime sized like the .NET one, and of a power of
+    # two table against an ideal random hash. Returns the number of patterns
+    # that stray too far.
+    failures = 0
+    print(
+        f"{'Type':<8}{'pattern':<16}{'keys':>9}{'collisions':>12}{'ideal':>8}"
+        f"{'empty':>8}{'ideal':>8}{'empty2':>8}{'ideal':>8}{'chain':>7}"
+    )
+    for typeId, vectorSize in units():
+        numeric = TYPES[typeId]
+        if numeric not in INTEGER_BITS:
+            continue
+        gen = GenerateNumeric(typeId, vectorSize)
+        gen.generate()
+        vector_hash = compile_hash(gen.result, vectorSize)
+        for pattern, coordinates in hash_patterns(numeric, vectorSize, keys).items():
+            hashes = list(itertools.starmap(vector_hash, coordinates))
+            count = len(hashes)
+            collisions = count - len(set(hashes))
+            expected = count * (count - 1) / 2**33
+            primeBuckets = [0] * next_prime(count)
+            maskBuckets = [0] * (1 << (count - 1).bit_length())
+            for h in hashes:
+                primeBuckets[h % len(primeBuckets)] += 1
+                maskBuckets[h & (len(maskBuckets) - 1)] += 1
+            empty = primeBuckets.count(0) / len(primeBuckets)
+            empty2 = maskBuckets.count(0) / len(maskBuckets)
+            ideal = math.exp(-count / len(primeBuckets))
+            ideal2 = math.exp(-count / len(maskBuckets))
+            failed = (
+                collisions > expected * HASH_COLLISION_SLACK + 8
+                or empty > ideal + HASH_EMPTY_SLACK
+                or empty2 > ideal2 + HASH_EMPTY_SLACK
+            )
+            failures += failed
+            print(
+                f"{gen.gen_vector_type():<8}{pattern:<16}{count:>9}{collisions:>12}{expected:>8.1f}"
+                f"{empty:>8.3f}{ideal:>8.3f}{empty2:>8.3f}{ideal2:>8.3f}{max(primeBuckets):>7}"
+                f"{'  FAILED' if failed else ''}"
+            )
+    print(f"{failures} key patterns hash worse than a random hash")
+    return failures
+
+
+def plain_format(self: BaseGenerator, piece: str, i: int = 0, **additional):
+    # Reference implementation of gen_format, for benchmarking the templates.
+    return piece.format(
+        NL=NEWLINE,
+        L=VECTOR_LETTERS[i],
+        T=self.gen_vector_type(),
+        BT=self.gen_vector_type(0, 3),
+        NT=self.gen_numeric_type(),
+        VA1=FIRST_VECTOR_ARG,
+        VA2=SECOND_VECTOR_ARG,
+        VA=SINGLE_VECTOR_ARG,
+        NA=NUMERIC_ARG,
+        **additional,
+    )
+
+
+def plain_sequence(
+    self: BaseGenerator, piece: str = "{L}", separator: str = COMA, size: int = 0, **additional
+) -> str:
+    if size == 0:
+        size = self.vectorSize
+    return separator.join(self.gen_format(piece, i, **additional) for i in range(size))
+
+
+@contextlib.contextmanager
+def plain_formatting():
+    compiled = BaseGenerator.gen_format, BaseGenerator.gen_sequence
+    BaseGenerator.gen_format, BaseGenerator.gen_sequence = plain_format, plain_sequence
+    try:
+        yield
+    finally:
+        BaseGenerator.gen_format, BaseGenerator.gen_sequence = compiled
+
+
+def benchmark(rounds: int, jobs: int = 1, options: dict = None):
+    # Best of `rounds` runs of the real build() into a temp folder, writes,
+    # manifest and worker processes included: cold into an empty folder with
+    # cleared template caches, warm on its up to date output and forced over
+    # it. The cold build runs again with str.format, forked workers inherit it.
+    def run(folder: Path, force: bool = False) -> float:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            build(folder, force, jobs, False, options)
+        return time.perf_counter() - started
+
+    def measure():
+        best = texts = None
+        for _ in range(rounds):
+            with tempfile.TemporaryDirectory() as temp:
+                folder = Path(temp)
+                clear_template_caches()
+                times = (run(folder), run(folder), run(folder, True))
+                texts = {file.name: file.read_bytes() for file in folder.glob("*.cs")}
+            best = times if best is None else tuple(map(min, best, times))
+        return best, texts
+
+    (cold, warm, forced), compiled_texts = measure()
+    with plain_formatting():
+        (plain, _, _), plain_texts = measure()
+    if compiled_texts != plain_texts:
+        raise RuntimeError("Compiled templates render different output than str.format")
+    print(f"cold build:   {cold * 1000:.2f} ms ({plain * 1000:.2f} ms with str.format, {plain / cold:.2f}x)")
+    print(f"warm build:   {warm * 1000:.2f} ms")
+    print(f"forced build: {forced * 1000:.2f} ms")
 
 
-def build():
-    for i in range(2, 3 + 2):
-        for typeId in range(3):
-            gn = GenerateNumeric(typeId, i)
-            gn.generate()
-            write_file(gn)
-        gb = GenerateBoolean(i)
-        gb.generate()
-        write_file(gb)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate the Support.Numerics vector structs.")
+    parser.add_argument("-o", "--output", type=Path, default=FOLDER, help="output folder (default: next to this script)")
+    parser.add_argument("-f", "--force", action="store_true", help="rewrite every file even when unchanged")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes (default: %(default)s)")
+    parser.add_argument("--simd", action="store_true", help="emit Vector128 paths for the types that fit one")
+    parser.add_argument(
+        "--swizzles", choices=SWIZZLE_MODES, default="all",
+        help="named swizzle properties to emit, permutations skips repeated components (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--verify", type=Path, nargs="?", const=GOLDEN_FOLDER, metavar="DIR",
+        help="compare the output against the committed golden files, or the files in DIR, and exit with 1 when they differ",
+    )
+    parser.add_argument(
+        "--update-golden", action="store_true", help="rewrite the golden files of the given options and exit"
+    )
+    parser.add_argument(
+        "--benchmark", type=int, nargs="?", const=20, metavar="ROUNDS",
+        help="time cold, warm and forced builds into a temp folder, with --jobs and the given options, "
+        "and the cold one with str.format, then exit (default: 20 rounds)",
+    )
+    parser.add_argument(
+        "--specialize", action="store_true",
+        help="emit int, float and double specializations of the generic Vec2/3/4<N>, then check their parity",
+    )
+    parser.add_argument(
+        "--check-parity", action="store_true",
+        help="exit with 1 when the specializations in the output folder lack a member of the generic API",
+    )
+    parser.add_argument(
+        "--generic", type=Path, default=GENERIC_FOLDER, metavar="DIR",
+        help="folder of the generic Vec2/3/4<N> sources (default: Support/Numerics)",
+    )
+    parser.add_argument(
+        "--check-arithmetic", action="store_true",
+        help="run the squared lengths and distances of the compact vectors on values that wrap and exit",
+    )
+    parser.add_argument(
+        "--hash-check", type=int, nargs="?", const=HASH_CHECK_KEYS, metavar="KEYS",
+        help="check the generated integer vector hashes over cubes and strided grids of about KEYS coordinates "
+        "and exit (default: %(const)s)",
+    )
+    parser.add_argument("--profile", action="store_true", help="print time and output size of every section")
+    parser.add_argument("--profile-json", type=Path, metavar="FILE", help="write the section profile as JSON")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    build()
\ No newline at end of file
+    args = parse_args()
+    options = {"simd": args.simd, "swizzles": args.swizzles}
+    if args.benchmark:
+        benchmark(args.benchmark, args.jobs, options)
+    elif args.check_arithmetic:
+        sys.exit(1 if arithmetic_check() else 0)
+    elif args.hash_check:
+        sys.exit(1 if hash_check(args.hash_check) else 0)
+    elif args.specialize or args.check_parity:
+        if args.specialize:
+            specialize(args.output, args.generic)
+        sys.exit(1 if check_parity(args.output, args.generic) else 0)
+    elif args.update_golden:
+        update_golden(options)
+    elif args.verify is not None:
+        folder = None if args.verify == GOLDEN_FOLDER else args.verify
+        sys.exit(1 if verify(folder, options) else 0)
+    else:
+        profile = args.profile or args.profile_json is not None
+        records = build(args.output, args.force, args.jobs, profile, options)
+        if args.profile:
+            print_profile(records)
+        if args.profile_json is not None:
+            with open(args.profile_json, "w") as file:
+                json.dump(records, file, indent=1)
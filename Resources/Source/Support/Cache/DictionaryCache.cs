@@ -18,7 +18,7 @@ public class DictionaryCache<K, V> where K : notnull
         public DateTime Time { get; init; }
     }
 
-    private readonly Dictionary<K, LinkedListNode<Data>> dataMapper = new();
+    private readonly Dictionary<K, LinkedListNode<Data>> dataMapper;
     private readonly LinkedList<Data> dataList = new();
 
     private readonly Action<K, V>? onEvict;
@@ -27,8 +27,9 @@ public class DictionaryCache<K, V> where K : notnull
     public int? MaxSize { get; }
     public int Count => dataMapper.Count;
 
-    public DictionaryCache(TimeSpan? maxOld = null, int? maxSize = null, Action<K, V>? onEvict = null)
+    public DictionaryCache(TimeSpan? maxOld = null, int? maxSize = null, Action<K, V>? onEvict = null, IEqualityComparer<K>? comparer = null)
     {
+        dataMapper = new(comparer);
         MaxOld = maxOld;
         MaxSize = maxSize;
         this.onEvict = onEvict;